@@ -0,0 +1,63 @@
+"""
+Compares loading and saving projects in XML and in the binary format.
+
+    python -m benchmarks.binary_benchmark [scenaries] [states]
+"""
+
+from scenario.models import Project
+from scenario.binary import default_binary_codec
+from benchmarks.fixtures import make_project
+import sys
+import timeit
+
+
+def _as_data(value):
+    """ Comparable form of models, sets don't keep order through XML """
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_as_data, value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(map(_as_data, value))
+    if hasattr(value, '_iter_set_fields'):
+        return (type(value), tuple(
+            (name, _as_data(v)) for name, v in value._iter_set_fields()
+        ))
+    return value
+
+
+def main(scenaries_count: int = 10, states_count: int = 1000) -> None:
+    project = make_project(scenaries_count, states_count)
+
+    xml = project.to_xml().encode("utf-8")
+    binary = default_binary_codec.dumps(project)
+    from_xml = Project.from_xml(xml)
+    if _as_data(default_binary_codec.loads(Project, binary)) != \
+            _as_data(project) or \
+            _as_data(default_binary_codec.loads(
+                Project, default_binary_codec.dumps(from_xml)
+            )) != _as_data(from_xml):
+        raise AssertionError("Binary format doesn't round-trip")
+
+    print(f"{scenaries_count * states_count} states, "
+          f"XML {len(xml) / 2**20:.1f} MiB, "
+          f"binary {len(binary) / 2**20:.1f} MiB")
+
+    for title, with_xml, with_binary in (
+        (
+            "load",
+            lambda: Project.from_xml(xml),
+            lambda: default_binary_codec.loads(Project, binary),
+        ),
+        (
+            "save",
+            lambda: project.to_xml().encode("utf-8"),
+            lambda: default_binary_codec.dumps(project),
+        ),
+    ):
+        xml_time = min(timeit.repeat(with_xml, number=1, repeat=3))
+        binary_time = min(timeit.repeat(with_binary, number=1, repeat=3))
+        print(f"{title:>6}: XML {xml_time:.3f}s, "
+              f"binary {binary_time:.3f}s, x{xml_time / binary_time:.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
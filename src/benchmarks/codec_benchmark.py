@@ -0,0 +1,56 @@
+"""
+Compares the generated XML codec with the reflective ElementTree path.
+
+    python -m benchmarks.codec_benchmark [scenaries] [states]
+"""
+
+from scenario.models import Project
+from benchmarks.fixtures import make_project
+import xml.etree.ElementTree as ET
+import sys
+import timeit
+
+
+def _reference_to_xml(project: Project) -> str:
+    return ET.tostring(project._to_xml_element(), encoding="unicode")
+
+
+def _reference_from_xml(data: str) -> Project:
+    return Project._from_xml_element(ET.fromstring(data))
+
+
+def main(scenaries_count: int = 10, states_count: int = 500) -> None:
+    project = make_project(scenaries_count, states_count)
+
+    reference_xml = _reference_to_xml(project)
+    codec_xml = project.to_xml()
+    # ElementTree leaves carriage returns of text as is, parsing loses them
+    if codec_xml != reference_xml.replace("\r", "&#13;"):
+        raise AssertionError("Codec output differs from ElementTree output")
+    if Project.from_xml(reference_xml).to_xml() != \
+            _reference_to_xml(_reference_from_xml(reference_xml)):
+        raise AssertionError("Codec decodes differently from ElementTree")
+
+    print(f"{scenaries_count * states_count} states, "
+          f"{len(reference_xml) / 2**20:.1f} MiB of XML")
+
+    for title, reference, codec in (
+        (
+            "to_xml",
+            lambda: _reference_to_xml(project),
+            lambda: project.to_xml(),
+        ),
+        (
+            "from_xml",
+            lambda: _reference_from_xml(reference_xml),
+            lambda: Project.from_xml(reference_xml),
+        ),
+    ):
+        reference_time = min(timeit.repeat(reference, number=1, repeat=3))
+        codec_time = min(timeit.repeat(codec, number=1, repeat=3))
+        print(f"{title:>8}: reference {reference_time:.3f}s, "
+              f"codec {codec_time:.3f}s, x{reference_time / codec_time:.1f}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
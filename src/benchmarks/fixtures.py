@@ -0,0 +1,71 @@
+from scenario.models import (
+    Project, Scenario, State, Statement, Point, ValueType, Condition,
+    ClickCoordsAction, ClickTextAction, WaitAction, WriteAction, RunAppAction,
+)
+import random
+
+
+_TEXTS = [
+    "", "Настройки", "a & b", "<tag>", "\"quoted\" 'single'",
+    "multi\nline\ttext\r", "plain text",
+]
+
+
+def make_scenario(
+    states_count: int,
+    name: str = "Scenario",
+    seed: int = 0,
+) -> Scenario:
+    """ Synthetic scenario, every state has actions of all kinds """
+
+    rnd = random.Random(seed)
+    states = list[State]()
+
+    for state_id in range(states_count):
+        next_states = {
+            rnd.randrange(states_count) for _ in range(rnd.randrange(4))
+        }
+        states.append(State(
+            name=f"state {state_id}",
+            state_id=state_id,
+            description=rnd.choice(_TEXTS),
+            # single statement, as sets of models have no stable order
+            statements={
+                Statement(
+                    value_type_1=ValueType.CONST,
+                    value1=rnd.choice(_TEXTS),
+                    value_type_2=ValueType.XPATH,
+                    value2=f"//node[@index='{state_id}']/@text",
+                    condition=rnd.choice(list(Condition)),
+                )
+            },
+            actions=[
+                ClickCoordsAction(
+                    coords=Point(x=rnd.random() * 1080, y=rnd.random() * 2000),
+                    duration_ms=rnd.randrange(500),
+                ),
+                ClickTextAction(text=rnd.choice(_TEXTS), duration_ms=100),
+                WaitAction(duration_ms=rnd.randrange(3000)),
+                WriteAction(text=rnd.choice(_TEXTS)),
+                RunAppAction(package_name="com.android.settings"),
+            ],
+            next_states=next_states,
+            priority=rnd.randrange(200),
+            position=Point(x=state_id * 150, y=rnd.randrange(-500, 500)),
+        ))
+
+    return Scenario(name=name, initial_state_id=0, states=states)
+
+
+def make_project(
+    scenaries_count: int,
+    states_count: int,
+    seed: int = 0,
+) -> Project:
+    return Project(
+        version="v0.1",
+        scenaries=[
+            make_scenario(states_count, f"Scenario {i}", seed + i)
+            for i in range(scenaries_count)
+        ],
+    )
@@ -0,0 +1,57 @@
+"""
+Measures memory taken by model instances.
+
+Slotted models are compared with the same data stored the way models kept
+it before, in a per-instance __dict__.
+
+    python -m benchmarks.memory_benchmark [states]
+"""
+
+from scenario.models import Action, Statement, Point
+from benchmarks.fixtures import make_scenario
+import sys
+import tracemalloc
+
+
+class _DictModel:
+    def __init__(self, **kwargs):
+        for field, value in kwargs.items():
+            setattr(self, field, value)
+
+
+def _as_dict_model(model):
+    return _DictModel(**dict(model._iter_set_fields()))
+
+
+def _measure(factory, count: int) -> float:
+    """ Average bytes allocated per instance made by factory """
+    tracemalloc.start()
+    instances = [factory(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return size / count
+
+
+def main(states_count: int = 10000) -> None:
+    scenario = make_scenario(states_count)
+    actions = [a for s in scenario.states for a in s.actions]
+    statements = [st for s in scenario.states for st in s.statements]
+    points = [s.position for s in scenario.states]
+
+    print(f"{'model':>12} {'__dict__':>10} {'__slots__':>10}")
+    for title, models in (
+        (Action.__name__, actions),
+        (Statement.__name__, statements),
+        (Point.__name__, points),
+    ):
+        slotted = _measure(
+            lambda i: type(models[i])(**dict(models[i]._iter_set_fields())),
+            len(models),
+        )
+        with_dict = _measure(lambda i: _as_dict_model(models[i]), len(models))
+        print(f"{title:>12} {with_dict:>9.0f}B {slotted:>9.0f}B")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""
+Times opening, panning and zooming a big scenario in the states graph, with
+and without the level of detail mode.
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.node_edit_benchmark [states]
+"""
+
+from qtpy import QtWidgets
+from editor.models.editor_model import ScenariesModel
+from editor.controllers.editor_controller import EditorController
+from editor.views.widgets.node_edit import NodeEdit
+from benchmarks.fixtures import make_scenario
+import sys
+import time
+
+
+def _time_frames(node_edit: NodeEdit, steps: int = 20) -> float:
+    """ Average time of a pan or zoom step, including the redraw """
+    viewer = node_edit._graph.viewer()
+    started = time.perf_counter()
+    for step in range(steps):
+        if step % 2:
+            # zoomed out far enough for the overview, then back
+            factor = 0.2 if step % 4 == 1 else 5.0
+            viewer.scale(factor, factor)
+        else:
+            x, y, width, height = viewer.scene_rect()
+            viewer.set_scene_rect([x + width / 2, y, width, height])
+        node_edit.update_visible_nodes()
+        viewer.viewport().repaint()
+    return (time.perf_counter() - started) / steps
+
+
+def main(states_count: int = 3000) -> None:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    scenario = make_scenario(states_count)
+    scenaries_model = ScenariesModel([scenario])
+    states_model = scenaries_model.get_states_model(scenario)
+    controller = EditorController(None)
+
+    print(f"{states_count} states, "
+          f"{sum(len(s.next_states) for s in scenario.states)} edges")
+
+    for lod_enabled in (False, True):
+        node_edit = NodeEdit(model=None, controller=controller)
+        node_edit.set_lod_enabled(lod_enabled)
+        node_edit.resize(1280, 720)
+        node_edit.show()
+        app.processEvents()
+
+        started = time.perf_counter()
+        node_edit.set_model(states_model)
+        node_edit._graph.viewer().viewport().repaint()
+        open_time = time.perf_counter() - started
+
+        frame_time = _time_frames(node_edit)
+        print(f"LOD {'on ' if lod_enabled else 'off'}: "
+              f"open {open_time:.3f}s, pan/zoom step {frame_time:.3f}s")
+
+        node_edit.close()
+        node_edit.deleteLater()
+        app.processEvents()
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,91 @@
+"""
+Checks cold start of the editor against a time budget. Imports of the
+welcome window are timed with -X importtime in fresh interpreters, modules
+that should be loaded only once a project is opened must not show up.
+
+    python -m benchmarks.startup_benchmark [budget_ms]
+
+Exits with status 1 if the budget is exceeded or a deferred module is
+imported on start.
+"""
+
+import os
+import subprocess
+import sys
+
+
+BUDGET_MS = 700
+RUNS = 5
+
+# loaded with the editor window and on first execution
+DEFERRED_MODULES = (
+    "editor.views.editor_window",
+    "editor.project_manager",
+    "NodeGraphQt",
+    "qtawesome",
+    "uiautomator",
+    "lxml",
+)
+
+
+def _import_editor() -> tuple[float, set[str]]:
+    """ Import time of editor.app in ms and the modules imported with it """
+
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import editor.app"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    modules = set[str]()
+    # "import time: self [us] | cumulative | imported package"
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue   # header
+        modules.add(name.strip())
+        if not name.startswith("  "):   # top level imports only
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def main(budget_ms: float = BUDGET_MS) -> int:
+    times = list[float]()
+    modules = set[str]()
+    for _ in range(RUNS):
+        run_time, modules = _import_editor()
+        times.append(run_time)
+
+    best = min(times)
+    print(f"editor.app import: best {best:.0f} ms, "
+          f"worst {max(times):.0f} ms, budget {budget_ms:.0f} ms")
+
+    failed = False
+    if best > budget_ms:
+        print(f"Cold start is over the budget by {best - budget_ms:.0f} ms")
+        failed = True
+
+    deferred = [
+        prefix for prefix in DEFERRED_MODULES
+        if any(
+            name == prefix or name.startswith(prefix + ".")
+            for name in modules
+        )
+    ]
+    if deferred:
+        print("Imported on start: " + ", ".join(deferred))
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(float, sys.argv[1:])))
@@ -1,53 +1,19 @@
-from .views.welcome_window import WelcomeWindow
-from .views.editor_window import EditorWindow
+"""
+Only the welcome window is loaded on start. The editor window, the project
+handling and the device stack are imported when a project is opened.
+"""
 
+from .views.welcome_window import WelcomeWindow
 from .controllers.welcome_controller import WelcomeController
-from .controllers.editor_controller import EditorController
-
 from .models.welcome_model import WelcomeModel
-from .models.editor_model import EditorModel
-
 from .models.datastore.storage import JsonFileStorage
 
-from scenario.models import Project
-
 from qtpy import QtCore
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-import os
-
-
-
-class ProjectManager:
-    _DEFAULT_PROJECT = Project(
-        version="v0.1",
-        scenaries=[],
-    )
-
-    def __init__(self):
-        self._file_path: str | None = None
-        self._current_project = self._DEFAULT_PROJECT
-
-    def get_project(self) -> Project:
-        return self._current_project
-
-    def create_project(self, file_path: str | os.PathLike):
-        self._current_project = self._DEFAULT_PROJECT
-        print(self._current_project)
-        with open(file_path, 'w') as file:
-            file.write(self._current_project.to_xml())
-        self._file_path = file_path
-
-    def open_project(self, file_path: str | os.PathLike) -> Project:
-        with open(file_path, 'r') as file:
-            self._current_project = Project.from_xml(file.read())
-        self._file_path = file_path
-        return self._current_project
-
-    def save_project(self) -> None:
-        with open(self._file_path, 'w') as file:
-            file.write(self._current_project.to_xml())
-
+if TYPE_CHECKING:
+    from .project_manager import ProjectManager
 
 
 class Application(QtCore.QObject):
@@ -58,22 +24,41 @@ class Application(QtCore.QObject):
         self._local_storage = JsonFileStorage(Path.home() / '.roboflow')
         self._local_storage.init_storage()
 
-        self._project_manager = ProjectManager()
+        self._project_manager: "ProjectManager | None" = None
 
         self._welcome_model = None
         self._welcome_controller = None
         self._welcome_window = None
 
         self._editor_model = None
-        self._welcome_controller = None
-        self._welcome_window = None
+        self._editor_controller = None
+        self._editor_window = None
 
         self._init_welcome_window()
-        self._init_editor_window()
 
         self._welcome_window.show()
 
+    def _get_project_manager(self) -> "ProjectManager":
+        if self._project_manager is None:
+            from .models.datastore.project_cache import ProjectCache
+            from .project_manager import ProjectManager
+
+            project_cache = ProjectCache(
+                storage=self._local_storage,
+                cache_dir=Path.home() / '.roboflow' / 'cache',
+            )
+            project_cache.init_cache()
+            self._project_manager = ProjectManager(cache=project_cache)
+        return self._project_manager
+
     def _init_editor_window(self) -> None:
+        from .views.editor_window import EditorWindow
+        from .controllers.editor_controller import EditorController
+        from .models.editor_model import EditorModel
+        from scenario.models import Project
+
+        project_manager = self._get_project_manager()
+
         self._editor_model = EditorModel(
             storage=self._local_storage,
             project=Project(
@@ -81,9 +66,12 @@ class Application(QtCore.QObject):
                 scenaries=[],
             )
         )
-        self._editor_controller = EditorController(self._editor_model)
-        self._editor_controller.project_saved.connect(
-            self._project_manager.save_project
+        self._editor_controller = EditorController(
+            model=self._editor_model,
+            save_project=project_manager.save_project,
+        )
+        self._editor_model.scenaries_model.scenario_changed.connect(
+            project_manager.invalidate_scenario
         )
         self._editor_window = EditorWindow(
             controller=self._editor_controller,
@@ -108,13 +96,16 @@ class Application(QtCore.QObject):
 
     def _open_project(self, file_path: str, create: bool = False) -> None:
         try:
+            project_manager = self._get_project_manager()
             if create:
-                project = self._project_manager.create_project(file_path)
+                project = project_manager.create_project(file_path)
             else:
-                project = self._project_manager.open_project(file_path)
+                project = project_manager.open_project(file_path)
         except Exception as e:   
             raise e        # TODO show message
         else:
+            if self._editor_window is None:
+                self._init_editor_window()
             self._editor_model.set_project(project)
             self._welcome_window.hide()
             self._editor_window.show()
\ No newline at end of file
@@ -1,33 +1,153 @@
 from qtpy import QtCore
 from editor.models.editor_model import EditorModel
 from scenario.models import Scenario, State, Point, Action
-from roboflow.main import execute_scenario
+from roboflow.wait import WaitPolicy
 from random import randrange
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from roboflow.devices import DevicePool
+    from .execution_worker import ExecutionWorker
 
-class EditorController(QtCore.QObject):
-    project_saved = QtCore.Signal()    
 
-    def __init__(self, model: EditorModel):
+class EditorController(QtCore.QObject):
+    project_saved = QtCore.Signal()
+    project_save_failed = QtCore.Signal(str)
+    execution_started = QtCore.Signal()
+    execution_state_entered = QtCore.Signal(str)
+    execution_finished = QtCore.Signal(bool)
+    devices_updated = QtCore.Signal(list)   # list[DeviceInfo]
+    devices_update_failed = QtCore.Signal(str)
+    # journal position the save was started at, from the writer thread
+    _save_finished = QtCore.Signal(int)
+
+    def __init__(
+        self,
+        model: EditorModel,
+        save_project: Callable[[], Future] | None = None,
+    ):
+        """
+        Args:
+            save_project (Callable | None): Starts saving the project in
+                                            background, see ProjectManager.
+        """
         super(EditorController, self).__init__()
         self._model = model
+        self._save_project = save_project
+        self._save_finished.connect(self._on_save_finished)
+
+        self._execution_thread: QtCore.QThread | None = None
+        self._execution_worker: "ExecutionWorker | None" = None
+
+        self._device_pool: "DevicePool | None" = None
+        self._device_serial: str | None = None   # None for the only device
+        self._device_list_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="device-list"
+        )
+
+    def is_executing(self) -> bool:
+        return self._execution_thread is not None
 
     def execute(self, scenario: Scenario) -> None:
-        execute_scenario(scenario)
+        if self.is_executing():
+            return
+
+        # imports uiautomator, only needed once something is executed
+        from .execution_worker import ExecutionWorker
+
+        self._execution_thread = QtCore.QThread()
+        self._execution_worker = ExecutionWorker(
+            scenario=scenario,
+            wait_policy=WaitPolicy(),
+            device_pool=self._get_device_pool(),
+            serial=self._device_serial,
+        )
+        self._execution_worker.moveToThread(self._execution_thread)
+
+        self._execution_thread.started.connect(self._execution_worker.run)
+        self._execution_worker.state_entered.connect(
+            self.execution_state_entered
+        )
+        self._execution_worker.finished.connect(
+            self._on_execution_finished
+        )
+
+        self._execution_thread.start()
+        self.execution_started.emit()
+
+    def stop_execution(self) -> None:
+        if self._execution_worker is not None:
+            self._execution_worker.stop()
+
+    def update_devices(self) -> None:
+        """ Lists devices in background, emits devices_updated """
+        pool = self._get_device_pool()
+
+        def on_listed(future: Future) -> None:
+            # emitted from the worker thread, delivered to the GUI one
+            if future.exception() is not None:
+                self.devices_update_failed.emit(str(future.exception()))
+            else:
+                self.devices_updated.emit(future.result())
+
+        self._device_list_executor.submit(pool.list_devices) \
+            .add_done_callback(on_listed)
+
+    def set_device(self, serial: str | None) -> None:
+        """ Device the scenaries are executed on, its connection is set up
+        right away.
+        """
+        self._device_serial = serial
+        if serial is not None:
+            self._get_device_pool().warm_up(serial)
+
+    def _get_device_pool(self) -> "DevicePool":
+        if self._device_pool is None:
+            from roboflow.devices import DevicePool
+
+            self._device_pool = DevicePool()
+        return self._device_pool
+
+    @QtCore.Slot()
+    def _on_execution_finished(self, success: bool) -> None:
+        self._execution_thread.quit()
+        self._execution_thread.wait()
+        self._execution_worker.deleteLater()
+        self._execution_thread.deleteLater()
+        self._execution_thread = None
+        self._execution_worker = None
+        self.execution_finished.emit(success)
 
     def save_project(self) -> None:
+        """ Saves in background, emits project_saved or project_save_failed """
+        if self._save_project is None:
+            return
+        position = self._model.scenaries_model.journal.position
+        try:
+            future = self._save_project()
+        except Exception as e:
+            self.project_save_failed.emit(str(e))
+            return
+
+        def on_saved(future: Future) -> None:
+            # emitted from the writer thread, delivered to the GUI one
+            if future.exception() is not None:
+                self.project_save_failed.emit(str(future.exception()))
+            else:
+                self._save_finished.emit(position)
+
+        future.add_done_callback(on_saved)
+
+    @QtCore.Slot(int)
+    def _on_save_finished(self, position: int) -> None:
+        # changes made while saving are still unsaved
+        self._model.scenaries_model.journal.mark_clean(position)
         self.project_saved.emit()
 
     def create_scenario(self, name: str | None = None) -> None:
-        project = self._model.get_project()
-
         if name is None:
-            index = len(project.scenaries)
-            scenaries_names = (s.name for s in project.scenaries)
-            name = f"Scenario {index}"
-            while name in scenaries_names:
-                name = f"Scenario {index}"
-                index += 1
+            name = self._model.scenaries_model.get_free_scenario_name()
 
         state = State.get_blank_instance()
         state.name = "initial"
@@ -40,18 +160,13 @@ class EditorController(QtCore.QObject):
         self._model.scenaries_model.add_scenario(scenar)
 
     def create_state(self, scenario: Scenario) -> None:
-        state_id = 1
-        all_ids = (s.state_id for s in scenario.states)
-        while state_id in all_ids:
-            state_id += 1
+        states_model = self._model.scenaries_model.get_states_model(scenario)
 
         state = State.get_blank_instance()
-        state.state_id = state_id
+        state.state_id = states_model.allocate_state_id()
         state.name = "untitled"
 
-        self._model.scenaries_model \
-            .get_states_model(scenario) \
-            .add_state(state)
+        states_model.add_state(state)
 
     def update_state(self, scenario: Scenario, state: State, **kwargs) -> None:
         self._model.scenaries_model \
@@ -94,9 +209,8 @@ class EditorController(QtCore.QObject):
     def update_scenario(self, scenario: Scenario) -> None:
         self._model.scenaries_model.update_scenario(scenario)
 
-    def rename_scenario(self, scenario: Scenario, name: str) -> None:   # TODO блять
-        scenario.name = name
-        self._model.scenaries_model.update_scenario(scenario)
+    def rename_scenario(self, scenario: Scenario, name: str) -> None:
+        self._model.scenaries_model.rename_scenario(scenario, name)
 
     def commit_changes(self) -> None:
         self.on_commit_changes.emit()
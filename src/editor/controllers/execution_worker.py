@@ -0,0 +1,54 @@
+from qtpy import QtCore
+from scenario.models import Scenario, State
+from roboflow.main import execute_scenario, ExecutionCancelled, logger
+from roboflow.wait import WaitPolicy
+from roboflow.devices import DevicePool, DeviceUnavailable
+from threading import Event
+
+
+class ExecutionWorker(QtCore.QObject):
+    """ Runs scenario in the thread the worker is moved to """
+
+    state_entered = QtCore.Signal(str)
+    finished = QtCore.Signal(bool)
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        wait_policy: WaitPolicy,
+        device_pool: DevicePool,
+        serial: str | None = None,
+    ):
+        super(ExecutionWorker, self).__init__()
+        self._scenario = scenario
+        self._wait_policy = wait_policy
+        self._device_pool = device_pool
+        self._serial = serial
+        self._stop_event = Event()
+
+    @QtCore.Slot()
+    def run(self) -> None:
+        success = False
+        try:
+            with self._device_pool.lease(self._serial) as device:
+                success = execute_scenario(
+                    scenario=self._scenario,
+                    device=device,
+                    wait_policy=self._wait_policy,
+                    stop_event=self._stop_event,
+                    on_state_entered=self._on_state_entered,
+                )
+        except ExecutionCancelled:
+            logger.info("Stopped")
+        except DeviceUnavailable as e:
+            logger.error(f"Device is unavailable: {e}")
+        except Exception:
+            logger.exception("Execution crashed")
+        self.finished.emit(success)
+
+    def stop(self) -> None:
+        """ Thread-safe, interrupts in-flight waits of the worker """
+        self._stop_event.set()
+
+    def _on_state_entered(self, state: State) -> None:
+        self.state_entered.emit(state.name)
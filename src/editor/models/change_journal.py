@@ -0,0 +1,72 @@
+from qtpy import QtCore
+from collections import deque
+from itertools import islice
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from scenario.models import Scenario
+
+
+class ChangeKind(Enum):
+    SCENARIO_ADDED   = "scenario_added"
+    SCENARIO_CHANGED = "scenario_changed"
+    SCENARIO_DELETED = "scenario_deleted"
+    STATE_ADDED      = "state_added"
+    STATE_CHANGED    = "state_changed"
+    STATE_DELETED    = "state_deleted"
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: ChangeKind
+    scenario: Scenario
+    state_id: int | None = None   # None for changes of scenario itself
+    field: str | None = None      # None if the whole object was added/deleted
+    old: Any = None
+    new: Any = None
+
+
+class ChangeJournal(QtCore.QObject):
+    """ Sequence of changes made through the editor models.
+
+    Events are numbered from 0, consumers remember the number they've seen
+    and ask for the later ones. Only the last max_length events are kept.
+    """
+
+    change_recorded = QtCore.Signal(object)   # ChangeEvent
+
+    def __init__(self, max_length: int = 10000):
+        super(ChangeJournal, self).__init__()
+        self._events = deque[ChangeEvent](maxlen=max_length)
+        self._position = 0       # number of the next event
+        self._clean_position = 0
+
+    @property
+    def position(self) -> int:
+        return self._position
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._position != self._clean_position
+
+    def mark_clean(self, position: int | None = None) -> None:
+        """ Remembers position as the saved one, the current one if None """
+        self._clean_position = self._position if position is None else position
+
+    def record(self, event: ChangeEvent) -> None:
+        self._events.append(event)
+        self._position += 1
+        self.change_recorded.emit(event)
+
+    def changes_since(self, position: int) -> list[ChangeEvent] | None:
+        """ Events recorded at position and later.
+
+        Returns:
+            None, if some of them are not kept anymore, so the consumer has
+            to assume everything changed.
+        """
+        first = self._position - len(self._events)
+        if position < first:
+            return None
+        return list(islice(self._events, position - first, None))
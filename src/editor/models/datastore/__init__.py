@@ -1,5 +1,8 @@
 """
 The package is intended for accessing the program's utility data files
+
+project_cache isn't imported here, as it pulls in the scenario package,
+which the welcome window doesn't need.
 """
 
 from .config_datastore import ConfigDataStore
@@ -0,0 +1,300 @@
+from .base_datastore import BaseDataStore
+from .storage import AbstractStorage
+from scenario.models import Project, Scenario
+from scenario.codec import default_codec
+from scenario.binary import InvalidBinaryData, default_binary_codec
+from scenario.loader import (
+    FileSignature, ProjectIndex, ProjectSource, ScenarioIndexEntry,
+    build_lazy_project, index_project,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field, replace
+from threading import Lock
+import hashlib
+import os
+import time
+
+
+CACHE_FORMAT = 2   # entries of other formats are dropped
+
+
+@dataclass(frozen=True)
+class CachedScenario:
+    name: str | None
+    start: int     # byte span in the project file, as indexed
+    end: int
+    sha256: str    # of the span
+    offset: int    # byte span of the binary form in the cache file
+    size: int
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    file_path: str
+    mtime_ns: int
+    file_size: int
+    sha256: str
+    cache_file: str
+    cache_size: int
+    used_at: float
+    attributes: dict[str, str] = field(default_factory=dict)
+    scenaries: list[CachedScenario] = field(default_factory=list)
+    format: int = 0
+
+
+@dataclass(frozen=True)
+class _Store:
+    entries: list[CacheEntry]
+
+
+class ProjectCacheDataStore(BaseDataStore):
+    _RECORD_NAME = "project_cache"
+    _DEFAULT_RECORD = asdict(_Store([]))
+    _STORE_MODEL = _Store
+
+    @property
+    def entries(self) -> list[CacheEntry]:
+        return self._store.entries
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class _CachedSource(ProjectSource):
+    """ Reads scenaries from their binary form in the cache file, or from the
+    project file once the cache file has been replaced.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        signature: FileSignature,
+        cache_path: str,
+        cache_signature: FileSignature,
+        spans: dict[ScenarioIndexEntry, tuple[int, int]],
+    ):
+        super().__init__(file_path, signature)
+        self._cache_path = cache_path
+        self._cache_signature = cache_signature
+        self._spans = spans
+
+    def decode_scenario(self, entry: ScenarioIndexEntry) -> Scenario:
+        self.check(os.stat(self.file_path))
+        offset, size = self._spans[entry]
+        try:
+            with open(self._cache_path, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                if FileSignature.of(stat) == self._cache_signature:
+                    file.seek(offset)
+                    return default_binary_codec.loads(
+                        Scenario, file.read(size)
+                    )
+        except (OSError, InvalidBinaryData):
+            pass
+        return super().decode_scenario(entry)
+
+
+class ProjectCache:
+    """ Scenaries of parsed projects kept in the binary format, see
+    scenario.binary.
+
+    Projects are opened lazily from the cached index, a scenario is decoded
+    from its binary form on first access, as scenario.loader does from XML.
+    An entry is valid while the file has the same mtime and size or, when
+    they changed, the same content hash. Least recently used entries are
+    evicted once cache files take more than max_size bytes.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorage,
+        cache_dir: str | os.PathLike,
+        max_size: int = 256 * 2**20,
+    ):
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+        self._index = ProjectCacheDataStore(storage)
+        self._lock = Lock()
+        # parsing for the cache doesn't hold up opening the project
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="project-cache"
+        )
+
+    def init_cache(self) -> None:
+        os.makedirs(self._cache_dir, exist_ok=True)
+        with self._lock:
+            self._index.update()
+            entries = self._index.entries
+            stale = [e for e in entries if e.format != CACHE_FORMAT]
+            for entry in stale:
+                entries.remove(entry)
+                self._unlink(entry)
+            if stale:
+                self._index.save()
+
+    def load(self, file_path: str | os.PathLike) -> Project | None:
+        """ Returns lazily loaded project or None if there is no valid entry """
+
+        file_path = os.path.abspath(file_path)
+        entry = self._get_entry(file_path)
+        if entry is None:
+            return None
+
+        stat = os.stat(file_path)
+        if (entry.mtime_ns, entry.file_size) != \
+                (stat.st_mtime_ns, stat.st_size):
+            with open(file_path, 'rb') as file:
+                stat = os.fstat(file.fileno())
+                if _digest(file.read()) != entry.sha256:
+                    self._remove_entry(entry)
+                    return None
+
+        cache_path = self._get_cache_path(entry)
+        try:
+            cache_stat = os.stat(cache_path)
+        except OSError:
+            cache_stat = None
+        if cache_stat is None or cache_stat.st_size != entry.cache_size:
+            self._remove_entry(entry)
+            return None
+
+        signature = FileSignature.of(stat)
+        index = ProjectIndex(
+            attributes=dict(entry.attributes),
+            scenaries=[
+                ScenarioIndexEntry(name=s.name, start=s.start, end=s.end)
+                for s in entry.scenaries
+            ],
+            signature=signature,
+        )
+        source = _CachedSource(
+            file_path=file_path,
+            signature=signature,
+            cache_path=cache_path,
+            cache_signature=FileSignature.of(cache_stat),
+            spans={
+                index_entry: (s.offset, s.size)
+                for index_entry, s in zip(index.scenaries, entry.scenaries)
+            },
+        )
+
+        self._put_entry(replace(
+            entry,
+            mtime_ns=stat.st_mtime_ns,
+            file_size=stat.st_size,
+            used_at=time.time(),
+        ))
+        return build_lazy_project(index, source)
+
+    def store(self, file_path: str | os.PathLike) -> Future:
+        """ Caches the project file in background.
+
+        Only scenaries changed since the file was cached last time are
+        parsed, the others are copied from the previous cache file.
+        """
+        return self._executor.submit(self._store, os.path.abspath(file_path))
+
+    def _store(self, file_path: str) -> None:
+        index = index_project(file_path)
+        with open(file_path, 'rb') as file:
+            if FileSignature.of(os.fstat(file.fileno())) != index.signature:
+                return   # changed while indexing, cached on the next store
+            data = file.read()
+        reused = self._read_blobs(self._get_entry(file_path))
+
+        blob = bytearray()
+        scenaries = list[CachedScenario]()
+        for index_entry in index.scenaries:
+            fragment = data[index_entry.start:index_entry.end]
+            fragment_digest = _digest(fragment)
+            scenario_blob = reused.get(fragment_digest)
+            if scenario_blob is None:
+                scenario_blob = default_binary_codec.dumps(
+                    default_codec.decode(Scenario, fragment)
+                )
+            scenaries.append(CachedScenario(
+                name=index_entry.name,
+                start=index_entry.start,
+                end=index_entry.end,
+                sha256=fragment_digest,
+                offset=len(blob),
+                size=len(scenario_blob),
+            ))
+            blob += scenario_blob
+
+        entry = CacheEntry(
+            file_path=file_path,
+            mtime_ns=index.signature.mtime_ns,
+            file_size=index.signature.size,
+            sha256=_digest(data),
+            cache_file=_digest(file_path.encode('utf-8')) + ".rfpb",
+            cache_size=len(blob),
+            used_at=time.time(),
+            attributes=dict(index.attributes),
+            scenaries=scenaries,
+            format=CACHE_FORMAT,
+        )
+        cache_path = self._get_cache_path(entry)
+        with open(cache_path + ".tmp", 'wb') as file:
+            file.write(blob)
+        os.replace(cache_path + ".tmp", cache_path)
+        self._put_entry(entry)
+
+    def _read_blobs(self, entry: CacheEntry | None) -> dict[str, bytes]:
+        """ Binary forms of the entry's scenaries by digests of their XML """
+        if entry is None:
+            return {}
+        try:
+            with open(self._get_cache_path(entry), 'rb') as file:
+                data = file.read()
+        except OSError:
+            return {}
+        if len(data) != entry.cache_size:
+            return {}
+        return {
+            s.sha256: data[s.offset:s.offset + s.size]
+            for s in entry.scenaries
+        }
+
+    def _get_cache_path(self, entry: CacheEntry) -> str:
+        return os.path.join(self._cache_dir, entry.cache_file)
+
+    def _get_entry(self, file_path: str) -> CacheEntry | None:
+        with self._lock:
+            for entry in self._index.entries:
+                if entry.file_path == file_path:
+                    return entry
+        return None
+
+    def _put_entry(self, new_entry: CacheEntry) -> None:
+        with self._lock:
+            entries = self._index.entries
+            entries[:] = [
+                e for e in entries if e.file_path != new_entry.file_path
+            ]
+            entries.append(new_entry)
+
+            entries.sort(key=lambda e: e.used_at)
+            total_size = sum(e.cache_size for e in entries)
+            while total_size > self._max_size and entries:
+                evicted = entries.pop(0)
+                total_size -= evicted.cache_size
+                self._unlink(evicted)
+
+            self._index.save()
+
+    def _remove_entry(self, entry: CacheEntry) -> None:
+        with self._lock:
+            entries = self._index.entries
+            if entry not in entries:   # already replaced or removed
+                return
+            entries.remove(entry)
+            self._unlink(entry)
+            self._index.save()
+
+    def _unlink(self, entry: CacheEntry) -> None:
+        try:
+            os.remove(self._get_cache_path(entry))
+        except FileNotFoundError:
+            pass
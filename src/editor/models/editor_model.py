@@ -1,12 +1,22 @@
 from PySide6 import QtCore
+from contextlib import contextmanager
+from typing import Iterator
 from .datastore import AbstractStorage
 from .datastore import ConfigDataStore
+from .change_journal import ChangeJournal, ChangeEvent, ChangeKind
 
 from scenario.models import Project, Scenario, State, Point, Action
 
 
 class ScenariesModel(QtCore.QObject):
-    scenaries_changed = QtCore.Signal(list)
+    scenaries_about_to_be_reset = QtCore.Signal()
+    scenaries_changed = QtCore.Signal(list)    # whole list was replaced
+    scenario_changed = QtCore.Signal(object)   # scenario or its states edited
+    # row of the scenario, emitted around list changes, for item models
+    scenario_about_to_be_inserted = QtCore.Signal(int)
+    scenario_inserted = QtCore.Signal(int)
+    scenario_about_to_be_removed = QtCore.Signal(int)
+    scenario_removed = QtCore.Signal(int)
     _states_changed = QtCore.Signal()   # for global project_changed signal
 
     def __init__(
@@ -15,45 +25,145 @@ class ScenariesModel(QtCore.QObject):
     ):
         super(ScenariesModel, self).__init__()
         self._scenaries = scenaries
-        # cache for singleton-like behaviour of StatesModel
-        self._states_models = dict[Scenario, StatesModel]()
+        # name -> number of scenaries with it, loaded projects may repeat names
+        self._names = dict[str, int]()
+        self._index_names()
+        # id(scenario) -> its StatesModel, for singleton-like behaviour;
+        # the model references the scenario, so the id isn't reused
+        self._states_models = dict[int, StatesModel]()
+
+        self._journal = ChangeJournal()
+        self._journal.change_recorded.connect(
+            lambda event: self.scenario_changed.emit(event.scenario)
+        )
+
+    @property
+    def journal(self) -> ChangeJournal:
+        return self._journal
 
     def set_scenaries(self, scenaries: list[Scenario]) -> None:
+        self.scenaries_about_to_be_reset.emit()
         self._scenaries = scenaries
+        self._index_names()
+        self._states_models.clear()
+        self._journal.mark_clean()   # freshly opened project has no changes
         self.scenaries_changed.emit(self.get_scenaries())
 
     def update_scenario(self, scenario: Scenario) -> None:
-        self.scenaries_changed.emit(self.get_scenaries())
+        self._journal.record(ChangeEvent(ChangeKind.SCENARIO_CHANGED, scenario))
+
+    def rename_scenario(self, scenario: Scenario, name: str) -> None:
+        old_name = scenario.name
+        scenario.name = name
+        self._remove_name(old_name)
+        self._add_name(name)
+        self._journal.record(ChangeEvent(
+            ChangeKind.SCENARIO_CHANGED, scenario,
+            field="name", old=old_name, new=name,
+        ))
     
     def delete_scenario(self, scenario: Scenario) -> None:
-        del self._scenaries[self._scenaries.index(scenario)]
-        self.scenaries_changed.emit(self.get_scenaries())
+        # identity scan in C, the project's list has to keep its order anyway
+        row = self._scenaries.index(scenario)
+        self.scenario_about_to_be_removed.emit(row)
+        del self._scenaries[row]
+        self._remove_name(scenario.name)
+        self._states_models.pop(id(scenario), None)
+        self.scenario_removed.emit(row)
+        self._journal.record(ChangeEvent(ChangeKind.SCENARIO_DELETED, scenario))
 
     def add_scenario(self, scenario: Scenario) -> None:
+        row = len(self._scenaries)
+        self.scenario_about_to_be_inserted.emit(row)
         self._scenaries.append(scenario)
-        self.scenaries_changed.emit(self._scenaries)
+        self._add_name(scenario.name)
+        self.scenario_inserted.emit(row)
+        self._journal.record(ChangeEvent(ChangeKind.SCENARIO_ADDED, scenario))
 
     def get_scenaries(self) -> list[Scenario]:
         return self._scenaries
 
-    def get_states_model(self, scenario: Scenario) -> None:
-        states_model = self._states_models.get(scenario)
+    def has_scenario_name(self, name: str) -> bool:
+        return name in self._names
+
+    def get_free_scenario_name(self, prefix: str = "Scenario") -> str:
+        index = len(self._scenaries)
+        while f"{prefix} {index}" in self._names:
+            index += 1
+        return f"{prefix} {index}"
+
+    def get_states_model(self, scenario: Scenario) -> "StatesModel":
+        states_model = self._states_models.get(id(scenario))
         if states_model is not None:
             return states_model
-        states_model = StatesModel(scenario)
+        states_model = StatesModel(scenario, self._journal)
         states_model.states_changed.connect(
             lambda _: self._states_changed.emit()
         )
-        self._states_models[scenario] = states_model
+        self._states_models[id(scenario)] = states_model
         return states_model
 
+    def _index_names(self) -> None:
+        self._names.clear()
+        for scenario in self._scenaries:
+            self._add_name(scenario.name)
+
+    def _add_name(self, name: str) -> None:
+        self._names[name] = self._names.get(name, 0) + 1
+
+    def _remove_name(self, name: str) -> None:
+        count = self._names.pop(name, 0) - 1
+        if count > 0:
+            self._names[name] = count
+
 
 class StatesModel(QtCore.QObject):
+    """ Changes are emitted once per event loop tick, as a delta of journal
+    events (states_delta) and the whole states list (states_changed).
+    """
+
     states_changed = QtCore.Signal(list)
+    # list[ChangeEvent], None if the journal doesn't keep them all anymore
+    states_delta = QtCore.Signal(object)
 
-    def __init__(self, scenario: Scenario):
+    def __init__(self, scenario: Scenario, journal: ChangeJournal):
         super(StatesModel, self).__init__()
         self._scenario = scenario
+        self._journal = journal
+
+        self._states_by_id = {s.state_id: s for s in scenario.states}
+        # ids of deleted states aren't given out again
+        self._next_state_id = max(self._states_by_id, default=0) + 1
+
+        # journal position of the first change not emitted yet
+        self._pending_position: int | None = None
+        self._transaction_depth = 0
+        self._emit_scheduled = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """ Mutations made inside are emitted together after it ends """
+        self._transaction_depth += 1
+        try:
+            yield
+        finally:
+            self._transaction_depth -= 1
+            self._schedule_emit()
+
+    def flush(self) -> None:
+        """ Emits pending changes right away """
+        self._emit_scheduled = False
+        events = list[ChangeEvent]()
+        if self._pending_position is not None:
+            events = self._journal.changes_since(self._pending_position)
+            self._pending_position = None
+        if events is not None:
+            events = [
+                e for e in events
+                if e.scenario is self._scenario and e.state_id is not None
+            ]
+        self.states_delta.emit(events)
+        self.states_changed.emit(self.get_states())
 
     def get_scenario(self) -> Scenario:
         return self._scenario
@@ -61,29 +171,100 @@ class StatesModel(QtCore.QObject):
     def get_states(self) -> list[State]:
         return self._scenario.states
 
+    def get_state(self, state_id: int) -> State | None:
+        return self._states_by_id.get(state_id)
+
+    def allocate_state_id(self) -> int:
+        state_id = self._next_state_id
+        self._next_state_id += 1
+        return state_id
+
     def add_state(self, state: State) -> None:
         self._scenario.states.append(state)
-        self.states_changed.emit(self.get_states())
+        self._states_by_id[state.state_id] = state
+        self._next_state_id = max(self._next_state_id, state.state_id + 1)
+        self._record(ChangeEvent(
+            ChangeKind.STATE_ADDED, self._scenario,
+            state_id=state.state_id, new=state,
+        ))
 
     def add_state_action(self, state: State, action: Action) -> None:
+        old_actions = list(state.actions)
         state.actions.append(action)
-        self.states_changed.emit(self.get_states())
+        self._record_state_change(
+            state, "actions", old_actions, list(state.actions)
+        )
 
     def add_state_connection(self, state_from: State, state_to: State) -> None:
+        old_next_states = set(state_from.next_states)
         state_from.next_states.add(state_to.state_id)
-        # self.states_changed.emit(self.get_states()) оно крашит, хз почему
+        self._record_state_change(
+            state_from, "next_states", old_next_states,
+            set(state_from.next_states),
+        )
 
     def set_state_position(self, state: State, position: Point) -> None:
+        old_position = state.position
         state.position = position
-        # self.states_changed.emit(self.get_states()) блять, опять
+        self._record_state_change(state, "position", old_position, position)
 
     def update_state(self, state: State, **kwargs) -> None:
         for name, value in kwargs.items():
+            old_value = getattr(state, name, None)
             setattr(state, name, value)
-        self.states_changed.emit(self.get_states())
+            if name == "state_id":
+                del self._states_by_id[old_value]
+                self._states_by_id[value] = state
+                self._next_state_id = max(self._next_state_id, value + 1)
+            self._record_state_change(state, name, old_value, value)
 
     def delete_state(self, state: State) -> None:
-        self.states_changed.emit(self.get_states())
+        states = self._scenario.states
+        del states[states.index(state)]
+        del self._states_by_id[state.state_id]
+        self._record(ChangeEvent(
+            ChangeKind.STATE_DELETED, self._scenario,
+            state_id=state.state_id, old=state,
+        ))
+        for other in states:
+            if state.state_id in other.next_states:
+                old_next_states = set(other.next_states)
+                other.next_states.discard(state.state_id)
+                self._record_state_change(
+                    other, "next_states", old_next_states,
+                    set(other.next_states),
+                )
+
+    def _record_state_change(
+        self,
+        state: State,
+        field: str,
+        old_value,
+        new_value,
+    ) -> None:
+        self._record(ChangeEvent(
+            ChangeKind.STATE_CHANGED, self._scenario,
+            state_id=state.state_id, field=field,
+            old=old_value, new=new_value,
+        ))
+
+    def _record(self, event: ChangeEvent) -> None:
+        if self._pending_position is None:
+            self._pending_position = self._journal.position
+        self._journal.record(event)
+        self._schedule_emit()
+
+    def _schedule_emit(self) -> None:
+        # emitting right from the views' handlers made them redraw the graph
+        # in the middle of their own signals
+        if self._transaction_depth or self._emit_scheduled:
+            return
+        self._emit_scheduled = True
+        QtCore.QTimer.singleShot(0, self._on_emit_timeout)
+
+    def _on_emit_timeout(self) -> None:
+        if self._emit_scheduled:   # not flushed meanwhile
+            self.flush()
 
 
 class EditorModel(QtCore.QObject):
@@ -0,0 +1,204 @@
+from qtpy import QtCore
+
+from scenario.models import Scenario, State
+from .editor_model import ScenariesModel
+from .change_journal import ChangeEvent, ChangeKind
+
+
+class ScenarioTreeModel(QtCore.QAbstractItemModel):
+    """ Scenaries with their states as children, over ScenariesModel.
+
+    States of a scenario are fetched only when it is expanded, so lazily
+    loaded scenaries are not decoded until then. Top level indexes have
+    internal id 0, states have id of their scenario.
+    """
+
+    def __init__(self, model: ScenariesModel, parent=None):
+        super(ScenarioTreeModel, self).__init__(parent)
+
+        self._model = model
+        # id(scenario) -> scenario, for the fetched ones
+        self._fetched_scenaries = dict[int, Scenario]()
+        self._fetched_counts = dict[int, int]()   # id(scenario) -> state rows
+        # id(scenario) -> row, rebuilt lazily after rows are moved
+        self._rows: dict[int, int] | None = None
+
+        model.scenaries_about_to_be_reset.connect(self.beginResetModel)
+        model.scenaries_changed.connect(self._on_reset)
+        model.scenario_about_to_be_inserted.connect(
+            lambda row: self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        )
+        model.scenario_inserted.connect(self._on_rows_inserted)
+        model.scenario_about_to_be_removed.connect(self._on_about_to_remove)
+        model.scenario_removed.connect(self._on_rows_removed)
+        model.journal.change_recorded.connect(self._on_change_recorded)
+
+    def get_scenario(self, index: QtCore.QModelIndex) -> Scenario | None:
+        """ Scenario of the row or the scenario the state row belongs to """
+        if not index.isValid():
+            return None
+        if index.internalId():
+            return self._fetched_scenaries[index.internalId()]
+        return self._model.get_scenaries()[index.row()]
+
+    def get_state(self, index: QtCore.QModelIndex) -> State | None:
+        if not index.isValid() or not index.internalId():
+            return None
+        return self._fetched_scenaries[index.internalId()].states[index.row()]
+
+    def index(
+        self,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex = QtCore.QModelIndex(),
+    ) -> QtCore.QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, 0)
+        scenario = self._model.get_scenaries()[parent.row()]
+        return self.createIndex(row, column, id(scenario))
+
+    def parent(self, index: QtCore.QModelIndex) -> QtCore.QModelIndex:
+        if not index.isValid() or not index.internalId():
+            return QtCore.QModelIndex()
+        return self.createIndex(self._get_row(index.internalId()), 0, 0)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:
+        if not parent.isValid():
+            return len(self._model.get_scenaries())
+        if parent.internalId() or parent.column() > 0:
+            return 0
+        scenario = self._model.get_scenaries()[parent.row()]
+        return self._fetched_counts.get(id(scenario), 0)
+
+    def columnCount(
+        self, parent: QtCore.QModelIndex = QtCore.QModelIndex()
+    ) -> int:
+        return 1
+
+    def hasChildren(
+        self, parent: QtCore.QModelIndex = QtCore.QModelIndex()
+    ) -> bool:
+        if not parent.isValid():
+            return bool(self._model.get_scenaries())
+        # states are unknown before fetching, every scenario can be expanded
+        return not parent.internalId()
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:
+        if not parent.isValid() or parent.internalId():
+            return False
+        scenario = self._model.get_scenaries()[parent.row()]
+        return id(scenario) not in self._fetched_scenaries
+
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:
+        if not self.canFetchMore(parent):
+            return
+        scenario = self._model.get_scenaries()[parent.row()]
+        states_count = len(scenario.states)
+        # marked first, views may ask for more while rows are inserted
+        self._fetched_scenaries[id(scenario)] = scenario
+        if not states_count:
+            self._fetched_counts[id(scenario)] = 0
+            return
+        self.beginInsertRows(parent, 0, states_count - 1)
+        self._fetched_counts[id(scenario)] = states_count
+        self.endInsertRows()
+
+    def data(
+        self,
+        index: QtCore.QModelIndex,
+        role: int = QtCore.Qt.DisplayRole,
+    ):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+        state = self.get_state(index)
+        if state is not None:
+            return state.name
+        return self.get_scenario(index).name
+
+    def headerData(
+        self,
+        section: int,
+        orientation: QtCore.Qt.Orientation,
+        role: int = QtCore.Qt.DisplayRole,
+    ):
+        if orientation == QtCore.Qt.Horizontal and \
+                role == QtCore.Qt.DisplayRole and section == 0:
+            return "Scenaries"
+        return None
+
+    def _get_row(self, scenario_id: int) -> int:
+        if self._rows is None:
+            self._rows = {
+                id(s): row for row, s in enumerate(self._model.get_scenaries())
+            }
+        return self._rows[scenario_id]
+
+    def _get_scenario_index(self, scenario: Scenario) -> QtCore.QModelIndex:
+        return self.createIndex(self._get_row(id(scenario)), 0, 0)
+
+    @QtCore.Slot()
+    def _on_reset(self, scenaries: list[Scenario]) -> None:
+        self._fetched_scenaries.clear()
+        self._fetched_counts.clear()
+        self._rows = None
+        self.endResetModel()
+
+    @QtCore.Slot()
+    def _on_rows_inserted(self, row: int) -> None:
+        self._rows = None
+        self.endInsertRows()
+
+    @QtCore.Slot()
+    def _on_about_to_remove(self, row: int) -> None:
+        scenario = self._model.get_scenaries()[row]
+        self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+        self._fetched_scenaries.pop(id(scenario), None)
+        self._fetched_counts.pop(id(scenario), None)
+
+    @QtCore.Slot()
+    def _on_rows_removed(self, row: int) -> None:
+        self._rows = None
+        self.endRemoveRows()
+
+    @QtCore.Slot()
+    def _on_change_recorded(self, event: ChangeEvent) -> None:
+        key = id(event.scenario)
+
+        if event.kind is ChangeKind.SCENARIO_CHANGED:
+            index = self._get_scenario_index(event.scenario)
+            self.dataChanged.emit(index, index)
+            return
+
+        fetched_count = self._fetched_counts.get(key)
+        if fetched_count is None:
+            return   # states are not shown yet
+
+        parent = self._get_scenario_index(event.scenario)
+        states = event.scenario.states
+
+        if event.kind is ChangeKind.STATE_ADDED and \
+                len(states) == fetched_count + 1 and \
+                states[-1].state_id == event.state_id:
+            self.beginInsertRows(parent, fetched_count, fetched_count)
+            self._fetched_counts[key] = fetched_count + 1
+            self.endInsertRows()
+
+        elif event.kind is ChangeKind.STATE_CHANGED:
+            if event.field == "name":
+                for row, state in enumerate(states):
+                    if state.state_id == event.state_id:
+                        index = self.index(row, 0, parent)
+                        self.dataChanged.emit(index, index)
+                        break
+
+        else:
+            # rows have moved, states of the scenario are fetched again
+            if fetched_count:
+                self.beginRemoveRows(parent, 0, fetched_count - 1)
+                self._fetched_counts[key] = 0
+                self.endRemoveRows()
+            del self._fetched_counts[key]
+            del self._fetched_scenaries[key]
+            self.fetchMore(parent)
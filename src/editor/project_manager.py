@@ -0,0 +1,87 @@
+from .models.datastore.project_cache import ProjectCache
+from .project_writer import ProjectWriter
+
+from scenario.models import Project, Scenario
+from scenario.loader import load_project
+from scenario.binary import default_binary_codec, is_binary_file
+
+from concurrent.futures import Future
+
+import logging
+import os
+
+
+logger = logging.getLogger("editor")
+
+
+class ProjectManager:
+    _DEFAULT_PROJECT = Project(
+        version="v0.1",
+        scenaries=[],
+    )
+
+    def __init__(self, cache: ProjectCache | None = None):
+        self._file_path: str | None = None
+        self._is_binary = False
+        self._cache = cache
+        self._writer = ProjectWriter()
+        self._current_project = self._DEFAULT_PROJECT
+
+    def get_project(self) -> Project:
+        return self._current_project
+
+    def create_project(self, file_path: str | os.PathLike) -> Project:
+        # a copy, as the editor adds scenaries to the returned project
+        self._current_project = Project(
+            version=self._DEFAULT_PROJECT.version,
+            scenaries=[],
+        )
+        logger.debug("Creating project %s", file_path)
+        with open(file_path, 'w') as file:
+            file.write(self._current_project.to_xml())
+        self._file_path = file_path
+        self._is_binary = False
+        return self._current_project
+
+    def open_project(self, file_path: str | os.PathLike) -> Project:
+        # project is saved back in the format it was opened in
+        self._is_binary = is_binary_file(file_path)
+        if self._is_binary:
+            with open(file_path, 'rb') as file:
+                self._current_project = default_binary_codec.loads(
+                    Project, file.read()
+                )
+        else:
+            project = None
+            if self._cache is not None:
+                project = self._cache.load(file_path)
+            if project is None:
+                # scenaries are decoded on first access, see scenario.loader
+                project = load_project(file_path)
+                if self._cache is not None:
+                    self._cache.store(file_path)
+            self._current_project = project
+        self._file_path = file_path
+        return self._current_project
+
+    def invalidate_scenario(self, scenario: Scenario) -> None:
+        self._writer.invalidate(scenario)
+
+    def save_project(self) -> Future:
+        """ Saves project in background, see ProjectWriter """
+        file_path = self._file_path
+        future = self._writer.save(
+            self._current_project, file_path, binary=self._is_binary
+        )
+
+        def on_saved(future: Future) -> None:
+            if future.exception() is not None:
+                logger.error(
+                    "Saving %s failed", file_path,
+                    exc_info=future.exception(),
+                )
+            elif self._cache is not None and not self._is_binary:
+                self._cache.store(file_path)
+
+        future.add_done_callback(on_saved)
+        return future
@@ -0,0 +1,192 @@
+"""
+Background project saving.
+
+The thread calling save only snapshots the scenaries changed since the
+previous save, in the binary form, so edits made later don't get into the
+file. A single worker thread encodes the project from the snapshots and
+writes it to a temporary file, which replaces the project file once it is
+synced to disk. Not materialized scenaries are read from their markup by the
+worker as well. Encoded scenaries are kept until they are changed, so a save
+after an edit encodes only the edited scenaries.
+"""
+
+from scenario.models import Project, Scenario
+from scenario.codec import default_codec
+from scenario.binary import default_binary_codec
+from scenario.loader import (
+    LazyScenario, ProjectSource, ScenarioIndexEntry, replace_project_file,
+)
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import tempfile
+
+
+def write_temp_file(file_path: str | os.PathLike, data: bytes) -> str:
+    """ Writes data to a synced temporary file next to file_path.
+
+    Returns:
+        Path of the temporary file, which keeps file_path's permissions.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            mode = os.stat(file_path).st_mode
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temp_path, mode & 0o7777)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def _sync_directory(file_path: str | os.PathLike) -> None:
+    """ Makes rename of the file durable, where the platform allows it """
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(file_path)), os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _EncodedScenario(Scenario):
+    """ Stands for a scenario in the project being encoded """
+
+    __slots__ = ("_xml", "_binary")
+    _xml_tag = "Scenario"
+
+    def __init__(self, xml: str | None = None, binary: bytes | None = None):
+        self._xml = xml
+        self._binary = binary
+
+    def _get_xml_fragment(self) -> str | None:
+        return self._xml
+
+    def _get_binary_fragment(self) -> bytes | None:
+        return self._binary
+
+
+class _SavedScenario:
+    """ Scenario as it was when saved, encoded by the writer thread """
+
+    def __init__(
+        self,
+        binary: bytes | None = None,
+        span: tuple[ProjectSource, ScenarioIndexEntry] | None = None,
+    ):
+        # dumped with all tags, see BinaryCodec.dumps
+        self._binary = binary
+        self._span = span
+        self._xml = None
+
+    def get_xml(self) -> str:
+        if self._xml is None:
+            if self._span is not None:
+                source, entry = self._span
+                self._xml = source.read_fragment(
+                    entry.start, entry.end
+                ).decode('utf-8')
+            else:
+                self._xml = default_codec.encode(
+                    default_binary_codec.loads(Scenario, self._binary)
+                )
+        return self._xml
+
+    def get_binary(self) -> bytes:
+        if self._binary is None:
+            source, entry = self._span
+            self._binary = default_binary_codec.dumps(
+                source.decode_scenario(entry), all_tags=True
+            )
+        return self._binary
+
+
+class ProjectWriter:
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="project-writer"
+        )
+        # id(scenario) -> (scenario, saved scenario), saved scenaries are
+        # encoded by the worker only
+        self._saved = dict[int, tuple[Scenario, _SavedScenario]]()
+
+    def invalidate(self, scenario: Scenario) -> None:
+        """ Drops saved scenario, has to be called on every change """
+        self._saved.pop(id(scenario), None)
+
+    def save(
+        self,
+        project: Project,
+        file_path: str | os.PathLike,
+        binary: bool = False,
+    ) -> Future:
+        """ Snapshots project and writes it in background, writes are done
+        in call order. Has to be called from the thread editing the project.
+        """
+        # scenaries added or deleted meanwhile don't affect the save
+        fields = dict(project._iter_set_fields())
+        fields["scenaries"] = list(project.scenaries)
+        snapshot = Project(**fields)
+
+        saved = dict[int, tuple[Scenario, _SavedScenario]]()
+        for scenario in snapshot.scenaries:
+            key = id(scenario)
+            cached = self._saved.get(key)
+            if cached is None or cached[0] is not scenario:
+                cached = (scenario, self._snapshot(scenario))
+            saved[key] = cached
+        self._saved = saved   # deleted scenaries are dropped
+
+        scenaries = [saved[id(s)][1] for s in snapshot.scenaries]
+        return self._executor.submit(
+            self._write, snapshot, scenaries, file_path, binary
+        )
+
+    @staticmethod
+    def _snapshot(scenario: Scenario) -> _SavedScenario:
+        if isinstance(scenario, LazyScenario):
+            span = scenario.get_markup_span()
+            if span is not None:
+                return _SavedScenario(span=span)
+        return _SavedScenario(
+            binary=default_binary_codec.dumps(scenario, all_tags=True)
+        )
+
+    def _write(
+        self,
+        project: Project,
+        scenaries: list[_SavedScenario],
+        file_path: str | os.PathLike,
+        binary: bool,
+    ) -> None:
+        fields = dict(project._iter_set_fields())
+        if binary:
+            fields["scenaries"] = [
+                _EncodedScenario(binary=s.get_binary()) for s in scenaries
+            ]
+            data = default_binary_codec.dumps(Project(**fields), all_tags=True)
+        else:
+            fields["scenaries"] = [
+                _EncodedScenario(xml=s.get_xml()) for s in scenaries
+            ]
+            data = default_codec.encode(Project(**fields)).encode('utf-8')
+
+        temp_path = write_temp_file(file_path, data)
+        try:
+            if binary:
+                os.replace(temp_path, file_path)
+            else:
+                replace_project_file(project, temp_path, file_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        _sync_directory(file_path)
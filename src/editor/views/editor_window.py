@@ -5,7 +5,6 @@ from editor.controllers.editor_controller import EditorController
 
 from .widgets.scenario_treeview import ScenarioTreeViewWidget
 from .widgets.state_edit import StateEditWidget
-from .widgets.node_edit import NodeEdit
 from .widgets.execute_widget import ExecuteWidget
 
 
@@ -19,13 +18,19 @@ class EditorWindow(QtWidgets.QMainWindow):
         *args, **kwargs
     ):
         super().__init__(*args, **kwargs)
-        self.setWindowTitle("Roboflow Editor")
+        # "[*]" shows as "*" while the project has unsaved changes
+        self.setWindowTitle("Roboflow Editor[*]")
         self.resize(1280, 720)
 
         self._controller = controller
         self._model = model
 
         self._init_menu_bar()
+        self._controller.project_save_failed.connect(self._on_save_failed)
+        self._controller.project_saved.connect(self._update_modified)
+        scenaries_model = self._model.scenaries_model
+        scenaries_model.journal.change_recorded.connect(self._update_modified)
+        scenaries_model.scenaries_changed.connect(self._update_modified)
 
         self._tree_view = ScenarioTreeViewWidget(
             model=self._model.scenaries_model, 
@@ -62,12 +67,24 @@ class EditorWindow(QtWidgets.QMainWindow):
         )
         self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, execute_widget_dock)
 
-        self._node_edit = NodeEdit(
-            model=None,
-            controller=self._controller
-        )
-        self._node_edit.state_selected.connect(self._on_state_selected)
-        self.setCentralWidget(self._node_edit)
+        # the graph widget pulls in NodeGraphQt, it's created for the first
+        # selected scenario
+        self._node_edit = None
+        placeholder = QtWidgets.QLabel("Select a scenario to edit its states")
+        placeholder.setAlignment(QtCore.Qt.AlignCenter)
+        self.setCentralWidget(placeholder)
+
+    def _get_node_edit(self):
+        if self._node_edit is None:
+            from .widgets.node_edit import NodeEdit
+
+            self._node_edit = NodeEdit(
+                model=None,
+                controller=self._controller
+            )
+            self._node_edit.state_selected.connect(self._on_state_selected)
+            self.setCentralWidget(self._node_edit)
+        return self._node_edit
 
     @QtCore.Slot()
     def _on_state_selected(self, scenario, state) -> None:
@@ -76,11 +93,23 @@ class EditorWindow(QtWidgets.QMainWindow):
 
     @QtCore.Slot()
     def _on_scenario_selected(self, scenario) -> None:
-        self._node_edit.set_model(
+        node_edit = self._get_node_edit()
+        node_edit.set_model(
             self._model.scenaries_model.get_states_model(scenario)
         )
         self._execute_widget.set_scenario(scenario)
-        self._node_edit.enable()
+        node_edit.enable()
+
+    @QtCore.Slot()
+    def _update_modified(self, *args) -> None:
+        self.setWindowModified(self._model.scenaries_model.journal.is_dirty)
+
+    @QtCore.Slot(str)
+    def _on_save_failed(self, message: str) -> None:
+        QtWidgets.QMessageBox.critical(
+            self, "Saving failed",
+            f"The project has not been saved:\n{message}",
+        )
 
     def _init_menu_bar(self) -> None:
         menu_bar = self.menuBar()
@@ -1,44 +1,87 @@
 from qtpy import QtWidgets, QtCore, QtGui
 from scenario.models import Scenario, State
-from roboflow.main import logger
 from editor.controllers.editor_controller import EditorController
 import logging
 import qtawesome as qta
 
 
+# same logger as roboflow.main's, which imports the device stack
+logger = logging.getLogger("roboflow")
+
+class _LogEmitter(QtCore.QObject):
+    record_added = QtCore.Signal(str)
+
+
 class LogHandler(logging.Handler):
-    #on_new_record = QtCore.Signal(str)
+    """ Forwards records to the GUI thread, can be used from any thread """
 
     def __init__(self, parent):
         super(LogHandler, self).__init__()
-        self._parent = parent
-        #super(logging.Handler, self).__init__()
+        # lives in the GUI thread, so emits from workers are queued
+        self._emitter = _LogEmitter()
+        self._emitter.record_added.connect(parent.add_record)
 
     def emit(self, record: logging.LogRecord):
         message = self.format(record)
-        self._parent.add_record(message)
+        self._emitter.record_added.emit(message)
 
 
 class LogWidget(QtWidgets.QPlainTextEdit):
-    def __init__(self, parent = None):
+    """ Log panel, records are buffered and appended in batches on timer.
+
+    Args:
+        flush_interval_ms (int): How often buffered records are appended.
+        max_block_count (int): Oldest lines are dropped beyond this count,
+                               0 means unlimited.
+    """
+
+    def __init__(
+        self,
+        parent = None,
+        flush_interval_ms: int = 100,
+        max_block_count: int = 10000,
+    ):
         super().__init__(parent=parent)
 
         self.setObjectName("LogWidget")
 
         self.setReadOnly(True)
+        self.setMaximumBlockCount(max_block_count)
+
+        self._pending_records = list[str]()
+        self._flush_timer = QtCore.QTimer(self)
+        self._flush_timer.setInterval(flush_interval_ms)
+        self._flush_timer.timeout.connect(self.flush)
 
         self._clear_button = QtWidgets.QPushButton(
             qta.icon("mdi.eraser"), "", self
         )
         self._clear_button.setFixedSize(24, 24)
-        self._clear_button.clicked.connect(self.clear)
+        self._clear_button.clicked.connect(self._on_clear)
         self._move_button_to_corner()
 
         self._handler = LogHandler(self)
-        #self._handler.on_new_record.connect(self.appendPlainText)
 
+    @QtCore.Slot(str)
     def add_record(self, record) -> None:
-        self.appendPlainText(record)
+        self._pending_records.append(record)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    @QtCore.Slot()
+    def flush(self) -> None:
+        self._flush_timer.stop()
+        if not self._pending_records:
+            return
+        # one append means one layout and repaint for the whole batch
+        self.appendPlainText("\n".join(self._pending_records))
+        self._pending_records.clear()
+
+    @QtCore.Slot()
+    def _on_clear(self) -> None:
+        self._pending_records.clear()
+        self.clear()
+
     def resizeEvent(self, event: QtGui.QResizeEvent):
         super().resizeEvent(event)
         self._move_button_to_corner()
@@ -65,23 +108,36 @@ class ExecuteWidget(QtWidgets.QWidget):
         self._start_button = QtWidgets.QPushButton(qta.icon("fa.play"), "Start")
         self._start_button.setFixedWidth(80)
         self._start_button.clicked.connect(self._on_start)
+        self._stop_button = QtWidgets.QPushButton(qta.icon("fa.stop"), "Stop")
+        self._stop_button.setFixedWidth(80)
+        self._stop_button.setEnabled(False)
+        self._stop_button.clicked.connect(self._on_stop)
+        self._state_label = QtWidgets.QLabel()
         self._device_combobox = QtWidgets.QComboBox()
         self._device_combobox.setMinimumWidth(200)
+        self._device_combobox.setPlaceholderText("No devices")
+        self._device_combobox.currentIndexChanged.connect(
+            self._on_device_selected
+        )
         self._update_devices_button = QtWidgets.QPushButton("Update")
         self._update_devices_button.setFixedWidth(60)
+        self._update_devices_button.clicked.connect(self._on_update_devices)
+        self._devices_listed = False
 
         h_layout = QtWidgets.QHBoxLayout()
         h_layout.addWidget(self._start_button)
+        h_layout.addWidget(self._stop_button)
         h_layout.addItem(QtWidgets.QSpacerItem(
             10, 0, 
             QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Fixed
         ))
-        #h_layout.addWidget(self._device_combobox)
-        #h_layout.addWidget(self._update_devices_button)
+        h_layout.addWidget(self._device_combobox)
+        h_layout.addWidget(self._update_devices_button)
         h_layout.addItem(QtWidgets.QSpacerItem(
             10, 10,
             QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding
         ))
+        h_layout.addWidget(self._state_label)
 
         self._log_widget = LogWidget(self)
         #self._logs_textedit = QtWidgets.QTextEdit()
@@ -98,10 +154,93 @@ class ExecuteWidget(QtWidgets.QWidget):
 
         logger.addHandler(self._log_widget.get_handler())
 
+        self._controller.execution_started.connect(
+            self._on_execution_started
+        )
+        self._controller.execution_state_entered.connect(
+            self._on_execution_state_entered
+        )
+        self._controller.execution_finished.connect(
+            self._on_execution_finished
+        )
+        self._controller.devices_updated.connect(self._on_devices_updated)
+        self._controller.devices_update_failed.connect(
+            self._on_devices_update_failed
+        )
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        super().showEvent(event)
+        # devices are listed on first show, not to load adb on start
+        if not self._devices_listed:
+            self._devices_listed = True
+            self._on_update_devices()
+
     def set_scenario(self, scenario: Scenario) -> None:
         self._scenario = scenario
-        self._start_button.setEnabled(True)
+        self._start_button.setEnabled(not self._controller.is_executing())
 
     @QtCore.Slot()
     def _on_start(self) -> None:
-        self._controller.execute(self._scenario)
\ No newline at end of file
+        self._controller.execute(self._scenario)
+
+    @QtCore.Slot()
+    def _on_stop(self) -> None:
+        self._stop_button.setEnabled(False)
+        self._controller.stop_execution()
+
+    @QtCore.Slot()
+    def _on_execution_started(self) -> None:
+        self._start_button.setEnabled(False)
+        self._stop_button.setEnabled(True)
+
+    @QtCore.Slot(str)
+    def _on_execution_state_entered(self, state_name: str) -> None:
+        self._state_label.setText(f"State: {state_name}")
+
+    @QtCore.Slot(bool)
+    def _on_execution_finished(self, success: bool) -> None:
+        self._state_label.setText("Success" if success else "Failed")
+        self._start_button.setEnabled(self._scenario is not None)
+        self._stop_button.setEnabled(False)
+
+    @QtCore.Slot()
+    def _on_update_devices(self) -> None:
+        self._update_devices_button.setEnabled(False)
+        self._controller.update_devices()
+
+    @QtCore.Slot(list)
+    def _on_devices_updated(self, devices: list) -> None:
+        selected = self._device_combobox.currentData()
+
+        self._device_combobox.blockSignals(True)
+        self._device_combobox.clear()
+        for info in devices:
+            text = info.serial if info.is_ready \
+                else f"{info.serial} ({info.state})"
+            self._device_combobox.addItem(text, info.serial)
+            # offline and unauthorized devices are shown, but can't be chosen
+            item = self._device_combobox.model().item(
+                self._device_combobox.count() - 1
+            )
+            item.setEnabled(info.is_ready)
+
+        ready = [info.serial for info in devices if info.is_ready]
+        if selected not in ready:
+            selected = ready[0] if ready else None
+        self._device_combobox.setCurrentIndex(
+            self._device_combobox.findData(selected)
+            if selected is not None else -1
+        )
+        self._device_combobox.blockSignals(False)
+
+        self._update_devices_button.setEnabled(True)
+        self._on_device_selected()
+
+    @QtCore.Slot(str)
+    def _on_devices_update_failed(self, message: str) -> None:
+        self._update_devices_button.setEnabled(True)
+        logger.error(f"Listing devices failed: {message}")
+
+    @QtCore.Slot()
+    def _on_device_selected(self) -> None:
+        self._controller.set_device(self._device_combobox.currentData())
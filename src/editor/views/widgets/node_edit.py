@@ -1,20 +1,36 @@
-from qtpy import QtWidgets, QtCore
+from qtpy import QtWidgets, QtCore, QtGui
 from NodeGraphQt import NodeGraph, BaseNode, Port
+from NodeGraphQt.constants import NodeEnum, PipeEnum
+from NodeGraphQt.widgets.viewer import NodeViewer
 
 from editor.models.editor_model import StatesModel
+from editor.models.change_journal import ChangeEvent, ChangeKind
 from editor.controllers.editor_controller import EditorController
 from scenario.models import State, Point, Scenario
 
 
+class StatesViewer(NodeViewer):
+    visible_rect_changed = QtCore.Signal()   # on every pan, zoom and resize
+
+    def _update_scene(self):
+        super()._update_scene()
+        self.visible_rect_changed.emit()
+
+
 class ModifiedNodeGraph(NodeGraph):
-    node_moved = QtCore.Signal(BaseNode)
+    state_nodes_moved = QtCore.Signal(list)   # all nodes of one drag
+
+    def __init__(self, parent=None, **kwargs):
+        undo_stack = kwargs.pop('undo_stack', None) or QtGui.QUndoStack()
+        kwargs.setdefault('viewer', StatesViewer(undo_stack=undo_stack))
+        super().__init__(parent, undo_stack=undo_stack, **kwargs)
 
     def _on_nodes_moved(self, node_data):
         super()._on_nodes_moved(node_data)
 
-        for node_view, prev_pos in node_data.items():
-            node = self.get_node_by_id(node_view.id)
-            self.node_moved.emit(node)
+        self.state_nodes_moved.emit([
+            self.get_node_by_id(node_view.id) for node_view in node_data
+        ])
 
 
 
@@ -32,9 +48,60 @@ class StateNode(BaseNode):
         self.set_port_deletion_allowed(mode=True)
 
 
+class StatesOverviewItem(QtWidgets.QGraphicsItem):
+    """ States without nodes drawn as rectangles, and edges between them
+    as lines, both batched into a single path.
+    """
+
+    def __init__(self):
+        super(StatesOverviewItem, self).__init__()
+        self.setZValue(-1)   # under nodes and pipes
+
+        self._states_path = QtGui.QPainterPath()
+        self._edges_path = QtGui.QPainterPath()
+        self._rect = QtCore.QRectF()
+
+        # zero width pens are cosmetic, lines stay visible when zoomed out
+        self._states_pen = QtGui.QPen(QtGui.QColor(74, 84, 85), 0)
+        self._states_brush = QtGui.QBrush(QtGui.QColor(13, 18, 23))
+        self._edges_pen = QtGui.QPen(QtGui.QColor(*PipeEnum.COLOR.value), 0)
+
+    def set_paths(
+        self,
+        states_path: QtGui.QPainterPath,
+        edges_path: QtGui.QPainterPath,
+    ) -> None:
+        self.prepareGeometryChange()
+        self._states_path = states_path
+        self._edges_path = edges_path
+        self._rect = states_path.boundingRect() | edges_path.boundingRect()
+        self.update()
+
+    def boundingRect(self) -> QtCore.QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None) -> None:
+        painter.setPen(self._edges_pen)
+        painter.setBrush(QtCore.Qt.NoBrush)
+        painter.drawPath(self._edges_path)
+        painter.setPen(self._states_pen)
+        painter.setBrush(self._states_brush)
+        painter.drawPath(self._states_path)
+
+
 class NodeEdit(QtWidgets.QWidget):
+    """ Graph of the scenario states.
+
+    In level of detail mode, only states in the visible part of the graph
+    get nodes, unless it's zoomed out. The rest are drawn by
+    StatesOverviewItem, which is cheap to pan and zoom.
+    """
+
     state_selected = QtCore.Signal(Scenario, State)
 
+    LOD_STATES_COUNT = 300   # smaller graphs are always drawn in detail
+    LOD_ZOOM = -0.5          # zoomed out below it, no state gets a node
+
     def __init__(
         self, 
         model: StatesModel | None,
@@ -43,8 +110,29 @@ class NodeEdit(QtWidgets.QWidget):
         super().__init__()
 
         self._controller = controller
+        self._model: StatesModel | None = None
+
+        # state_id -> node and its last drawn (name, x, y), for diff updates
+        self._nodes = dict[int, StateNode]()
+        self._drawn_states = dict[int, tuple[str, float, float]]()
+        self._edges = set[tuple[int, int]]()   # (state_id from, state_id to)
+
+        self._lod_enabled = True
+        self._overview = StatesOverviewItem()
+        self._overview.hide()
+        # visible part of the graph is checked at most once per interval
+        self._viewport_timer = QtCore.QTimer(self)
+        self._viewport_timer.setSingleShot(True)
+        self._viewport_timer.setInterval(50)
+        self._viewport_timer.timeout.connect(self.update_visible_nodes)
 
         self._graph = ModifiedNodeGraph()
+        # states may loop, and the check walks all paths on every connection
+        self._graph.set_acyclic(False)
+        self._graph.scene().addItem(self._overview)
+        self._graph.viewer().visible_rect_changed.connect(
+            self._schedule_viewport_update
+        )
         self._graph.register_node(StateNode)
         self._graph.port_connected.connect(self._on_port_connected)
         self._graph.node_double_clicked.connect(
@@ -53,8 +141,8 @@ class NodeEdit(QtWidgets.QWidget):
                 n.state
             )
         )
-        self._graph.node_moved.connect(
-            self._on_node_moved
+        self._graph.state_nodes_moved.connect(
+            self._on_nodes_moved
         )
         self._graph.nodes_deleted.connect(
             self._on_nodes_deleted
@@ -64,13 +152,21 @@ class NodeEdit(QtWidgets.QWidget):
         self._add_node_button.clicked.connect(self._on_add_node)
         self._add_node_button.setMinimumSize(QtCore.QSize(30, 30))
 
+        self._lod_checkbox = QtWidgets.QCheckBox("Level of detail")
+        self._lod_checkbox.setChecked(self._lod_enabled)
+        self._lod_checkbox.toggled.connect(self.set_lod_enabled)
+
         if model is not None:
             self.set_model(model)
         else:
             self.disable()
 
+        buttons_layout = QtWidgets.QHBoxLayout()
+        buttons_layout.addWidget(self._add_node_button, stretch=1)
+        buttons_layout.addWidget(self._lod_checkbox)
+
         layout = QtWidgets.QVBoxLayout()
-        layout.addWidget(self._add_node_button)
+        layout.addLayout(buttons_layout)
         layout.addWidget(self._graph.widget)
 
         self.setLayout(layout)
@@ -81,28 +177,98 @@ class NodeEdit(QtWidgets.QWidget):
     def disable(self) -> None:
         self._add_node_button.setEnabled(False)
 
+    def is_lod_enabled(self) -> bool:
+        return self._lod_enabled
+
+    def set_lod_enabled(self, enabled: bool) -> None:
+        if self._lod_enabled == enabled:
+            return
+        self._lod_enabled = enabled
+        self._lod_checkbox.setChecked(enabled)
+        if self._model is not None:
+            self._update_nodes(self._model.get_states())
+
     def set_model(self, model: StatesModel) -> None: 
+        if self._model is model:
+            return
+        if self._model is not None:
+            self._model.states_delta.disconnect(self._apply_delta)
+
         self._model = model
-        self._model.states_changed.connect(
-            self._update_nodes
+        self._model.states_delta.connect(
+            self._apply_delta
         )
+
+        self._graph.clear_session()
+        self._nodes.clear()
+        self._drawn_states.clear()
+        self._edges.clear()
         self._update_nodes(self._model.get_states())
 
-    @QtCore.Slot()
-    def _on_node_moved(self, node: StateNode) -> None:
-        pos = node.pos()
-        self._controller.set_state_position(
-            scenario=self._model.get_scenario(),
-            state=node.state,
-            pos=Point(x=pos[0], y=pos[1]),
+    def _is_lod_active(self) -> bool:
+        return self._lod_enabled and self._model is not None and \
+            len(self._model.get_states()) >= self.LOD_STATES_COUNT
+
+    def _get_detail_rect(self) -> QtCore.QRectF | None:
+        """ Scene rect, states positioned in which get nodes.
+
+        Returns:
+            None, if all states get them.
+        """
+        if not self._is_lod_active():
+            return None
+        viewer = self._graph.viewer()
+        if viewer.get_zoom() < self.LOD_ZOOM:
+            return QtCore.QRectF()
+        rect = viewer.mapToScene(viewer.viewport().rect()).boundingRect()
+        # position is the top left corner, partly visible nodes are included
+        return rect.adjusted(
+            -NodeEnum.WIDTH.value, -NodeEnum.HEIGHT.value, 0, 0
+        )
+
+    @staticmethod
+    def _is_detailed(state: State, detail_rect: QtCore.QRectF | None) -> bool:
+        return detail_rect is None or detail_rect.contains(
+            state.position.x, state.position.y
         )
 
+    @QtCore.Slot()
+    def _schedule_viewport_update(self) -> None:
+        if self._is_lod_active() and not self._viewport_timer.isActive():
+            self._viewport_timer.start()
+
+    @QtCore.Slot()
+    def update_visible_nodes(self) -> None:
+        """ Gives nodes to states which became visible, done by itself
+        shortly after the graph is panned or zoomed.
+        """
+        self._viewport_timer.stop()
+        if self._model is not None:
+            self._update_nodes(self._model.get_states())
+
+    @QtCore.Slot()
+    def _on_nodes_moved(self, nodes: list[StateNode]) -> None:
+        with self._model.transaction():
+            for node in nodes:
+                pos = node.pos()
+                self._drawn_states[node.state.state_id] = (
+                    node.state.name, pos[0], pos[1]
+                )
+                self._controller.set_state_position(
+                    scenario=self._model.get_scenario(),
+                    state=node.state,
+                    pos=Point(x=pos[0], y=pos[1]),
+                )
+
     @QtCore.Slot()
     def _on_nodes_deleted(self, nodes: list[str]) -> None:
         ...
 
     @QtCore.Slot()
     def _on_port_connected(self, port_in: Port, port_out: Port) -> None:
+        self._edges.add((
+            port_out.node().state.state_id, port_in.node().state.state_id
+        ))
         self._controller.add_state_connection(
             scenario=self._model.get_scenario(),
             state_from=port_out.node().state,
@@ -115,30 +281,147 @@ class NodeEdit(QtWidgets.QWidget):
             self._model.get_scenario()
         )
 
+    def _create_node(self, state: State) -> StateNode:
+        node = self._graph.create_node(
+            node_type="nodes.StateNode", 
+            name=state.name,
+            pos=(
+                state.position.x,
+                state.position.y
+            ),
+            push_undo=False,
+        )
+        if state.state_id == 0:
+            node.delete_input("in")
+        return node
+
     @QtCore.Slot()
-    def _update_nodes(self, states: list[State]) -> None:
-        print("nodes updated")
-        self._graph.clear_session()
+    def _apply_delta(self, events: list[ChangeEvent] | None) -> None:
+        if events is None:   # too many changes to replay
+            self._update_nodes(self._model.get_states())
+            return
+        if not events:
+            return
+        if any(e.kind is ChangeKind.STATE_DELETED for e in events):
+            self._update_nodes(self._model.get_states())
+            return
+
+        changed_ids = {e.state_id for e in events}
+        added_ids = {
+            e.state_id for e in events if e.kind is ChangeKind.STATE_ADDED
+        }
+        changed = [
+            s for s in self._model.get_states() if s.state_id in changed_ids
+        ]
+        # a node created for an existing state needs its incoming edges too,
+        # which the partial update doesn't know about
+        detail_rect = self._get_detail_rect()
+        if any(
+            s.state_id not in added_ids and
+                (s.state_id in self._nodes) != \
+                self._is_detailed(s, detail_rect)
+            for s in changed
+        ):
+            self._update_nodes(self._model.get_states())
+            return
+
+        self._update_nodes(changed, partial=True)
+
+    def _update_nodes(self, states: list[State], partial: bool = False) -> None:
+        """ Applies only the difference between drawn and actual states.
+
+        Args:
+            partial: states are only the changed ones, others are left as is.
+        """
+
+        states_by_id = {s.state_id: s for s in states}
+        detail_rect = self._get_detail_rect()
+        detailed = [s for s in states if self._is_detailed(s, detail_rect)]
+
+        detailed_ids = {s.state_id for s in detailed}
+
+        # nodes of deleted states and ones that left the detail rect
+        undrawn_ids = self._nodes.keys() - detailed_ids
+        if partial:
+            undrawn_ids &= states_by_id.keys()
+        if undrawn_ids:
+            for state_id in undrawn_ids:
+                self._graph.delete_node(
+                    self._nodes.pop(state_id), push_undo=False
+                )
+                del self._drawn_states[state_id]
+            self._edges = {
+                e for e in self._edges
+                if e[0] not in undrawn_ids and e[1] not in undrawn_ids
+            }
+
+        for state in detailed:
+            drawn = (state.name, state.position.x, state.position.y)
+            node = self._nodes.get(state.state_id)
+
+            if node is None:
+                node = self._create_node(state)
+                self._nodes[state.state_id] = node
+            elif self._drawn_states[state.state_id] != drawn:
+                if node.name() != state.name:
+                    node.set_name(state.name)
+                if tuple(node.pos()) != drawn[1:]:
+                    node.set_pos(*drawn[1:])
 
-        nodes = dict()
-        for state in states:
-            print(state.position)
-            node = self._graph.create_node(
-                node_type="nodes.StateNode", 
-                name=state.name,
-                pos=(
-                    state.position.x,
-                    state.position.y
-                ),
+            node.state = state
+            self._drawn_states[state.state_id] = drawn
+
+        edges = {
+            (state.state_id, next_id)
+            for state in detailed
+            for next_id in state.next_states
+            if next_id in self._nodes
+        }
+        # with partial update only edges going out of given states are known
+        drawn_edges = {e for e in self._edges if e[0] in states_by_id} \
+            if partial else self._edges
+        for state_from, state_to in drawn_edges - edges:
+            self._nodes[state_from].output(0).disconnect_from(
+                self._nodes[state_to].input(0),
                 push_undo=False,
+                emit_signal=False,
             )
-            if state.state_id == 0:
-                node.delete_input("in")
-            node.state = state
-            nodes[state.state_id] = node
+        for state_from, state_to in edges - drawn_edges:
+            if not self._nodes[state_to].input_ports():
+                continue    # initial state has no input
+            self._nodes[state_from].output(0).connect_to(
+                self._nodes[state_to].input(0),
+                push_undo=False,
+                emit_signal=False,
+            )
+        self._edges = (self._edges - drawn_edges) | edges
 
+        if detail_rect is None:
+            self._overview.hide()
+        else:
+            self._update_overview()
+            self._overview.show()
+
+    def _update_overview(self) -> None:
+        """ Redraws states without nodes and edges not drawn as pipes """
+        states = self._model.get_states()
+        width, height = NodeEnum.WIDTH.value, NodeEnum.HEIGHT.value
+        positions = {
+            s.state_id: (s.position.x, s.position.y) for s in states
+        }
+
+        states_path = QtGui.QPainterPath()
+        edges_path = QtGui.QPainterPath()
         for state in states:
-            node = nodes[state.state_id]
-            for s in state.next_states:
-                node.set_output(0, nodes[s].input(0))
-
+            x, y = positions[state.state_id]
+            has_node = state.state_id in self._nodes
+            if not has_node:
+                states_path.addRect(x, y, width, height)
+            for next_id in state.next_states:
+                next_pos = positions.get(next_id)
+                if next_pos is None or has_node and next_id in self._nodes:
+                    continue
+                edges_path.moveTo(x + width, y + height / 2)
+                edges_path.lineTo(next_pos[0], next_pos[1] + height / 2)
+
+        self._overview.set_paths(states_path, edges_path)
@@ -1,7 +1,8 @@
-from qtpy import QtWidgets, QtGui, QtCore
+from qtpy import QtWidgets, QtCore
 from scenario.models import Scenario
 from editor.controllers.editor_controller import EditorController
 from editor.models.editor_model import ScenariesModel
+from editor.models.scenario_tree_model import ScenarioTreeModel
 import qtawesome as qta
 
 from .dialogs import ConfirmationDialog, LineInputDialog
@@ -21,17 +22,14 @@ class ScenarioTreeViewWidget(QtWidgets.QWidget):
         super(ScenarioTreeViewWidget, self).__init__(*args, **kwargs)
 
         self._model = model
-        self._model.scenaries_changed.connect(
-            self._update_tree_view
-        )
         self._controller = controller
 
-        self._item_model = QtGui.QStandardItemModel()
-        self._item_model.setHorizontalHeaderLabels(['Scenaries'])
+        self._item_model = ScenarioTreeModel(self._model, self)
 
         self._tree_view = QtWidgets.QTreeView()
         self._tree_view.setModel(self._item_model)
         self._tree_view.setHeaderHidden(True)
+        self._tree_view.setUniformRowHeights(True)
         self._tree_view.setSelectionBehavior(
             QtWidgets.QAbstractItemView.SelectRows
         )
@@ -81,57 +79,43 @@ class ScenarioTreeViewWidget(QtWidgets.QWidget):
         main_layout.addWidget(self._tree_view)
         self.setLayout(main_layout)
 
-        self._update_tree_view(self._model.get_scenaries())
-
     @QtCore.Slot()
     def _on_item_double_clicked(self, index) -> None:
-        item = self._item_model.itemFromIndex(index)
-        print(item.scenario)
-        if item:
-            self.scenario_selected.emit(item.scenario)
+        scenario = self._item_model.get_scenario(index)
+        if scenario is not None:
+            self.scenario_selected.emit(scenario)
 
     @QtCore.Slot()
     def _on_edit_scenario(self) -> None:
-        item = self._get_selected_item()
-        if item is None:
+        scenario = self._get_selected_scenario()
+        if scenario is None:
             return
 
         dialog = LineInputDialog(
             title="Scenario Edit",
-            text=f"Enter new name of \"{item.scenario.name}\":",
+            text=f"Enter new name of \"{scenario.name}\":",
         )
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
             self._controller.rename_scenario(
-                scenario=item.scenario,
+                scenario=scenario,
                 name=dialog.get_text()
             )
 
     @QtCore.Slot()
     def _on_delete_scenario(self) -> None:
-        item = self._get_selected_item()
-        if item is None:
+        scenario = self._get_selected_scenario()
+        if scenario is None:
             return
 
         dialog = ConfirmationDialog(
-            f"Are you sure you want to delete the scenario \"{item.scenario.name}\"?"
+            f"Are you sure you want to delete the scenario \"{scenario.name}\"?"
         )
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
-            self._controller.delete_scenario(item.scenario)
+            self._controller.delete_scenario(scenario)
 
     @QtCore.Slot()
     def _on_add_scenario(self) -> None:
         self._controller.create_scenario()
 
-    @QtCore.Slot()
-    def _update_tree_view(self, scenaries: list[Scenario]) -> None:
-        self._item_model.clear()
-        root_item = self._item_model.invisibleRootItem()
-        for scenar in scenaries:
-            item = QtGui.QStandardItem(scenar.name)
-            item.scenario = scenar
-            root_item.appendRow(item)
-
-    def _get_selected_item(self) -> QtGui.QStandardItem | None:
-        index = self._tree_view.currentIndex()
-        if index.isValid():
-            return self._item_model.itemFromIndex(index)
+    def _get_selected_scenario(self) -> Scenario | None:
+        return self._item_model.get_scenario(self._tree_view.currentIndex())
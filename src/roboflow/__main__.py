@@ -0,0 +1,5 @@
+from roboflow.cli import main
+import sys
+
+
+sys.exit(main())
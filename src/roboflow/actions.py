@@ -0,0 +1,80 @@
+"""
+Compiles actions of a state into steps with fewer device round-trips.
+
+Consecutive clicks on coordinates, text inputs, app launches and short waits
+become a single batch of shell commands, sent to the device at once. Clicks
+on text need the UI hierarchy and long waits have to be cancellable, so they
+are run on the host and split batches.
+"""
+
+from scenario.models import (
+    Action, ClickCoordsAction, WaitAction, WriteAction, RunAppAction,
+)
+from roboflow.adb_shell import input_text_command, run_app_command
+from dataclasses import dataclass
+from typing import Sequence
+
+
+SHORT_WAIT_MS = 500        # longer waits are done on the host
+# device-side waits of a batch, bounds the time a stop request waits for
+MAX_BATCH_WAIT_MS = 1000
+
+
+@dataclass(frozen=True)
+class ShellBatch:
+    commands: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class HostAction:
+    action: Action
+
+
+ActionStep = ShellBatch | HostAction
+
+
+def tap_command(action: ClickCoordsAction) -> str:
+    """ Tap, or press held for duration_ms """
+    x, y = round(action.coords.x), round(action.coords.y)
+    if action.duration_ms > 0:
+        return f"input swipe {x} {y} {x} {y} {action.duration_ms}"
+    return f"input tap {x} {y}"
+
+
+def sleep_command(duration_ms: int) -> str:
+    return f"sleep {duration_ms / 1000:g}"
+
+
+def compile_actions(actions: Sequence[Action]) -> tuple[ActionStep, ...]:
+    """ Steps running the actions in order, with the same timing """
+
+    steps = list[ActionStep]()
+    commands = list[str]()
+    batch_wait_ms = 0
+
+    def flush() -> None:
+        nonlocal batch_wait_ms
+        if commands:
+            steps.append(ShellBatch(tuple(commands)))
+            commands.clear()
+        batch_wait_ms = 0
+
+    for action in actions:
+        if isinstance(action, ClickCoordsAction):
+            commands.append(tap_command(action))
+        elif isinstance(action, WriteAction):
+            commands.append(input_text_command(action.text))
+        elif isinstance(action, RunAppAction):
+            commands.append(run_app_command(action.package_name))
+        elif isinstance(action, WaitAction) and \
+                action.duration_ms <= SHORT_WAIT_MS and \
+                batch_wait_ms + action.duration_ms <= MAX_BATCH_WAIT_MS:
+            if action.duration_ms > 0:
+                commands.append(sleep_command(action.duration_ms))
+                batch_wait_ms += action.duration_ms
+        else:
+            flush()
+            steps.append(HostAction(action))
+    flush()
+
+    return tuple(steps)
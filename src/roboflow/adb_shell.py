@@ -0,0 +1,266 @@
+"""
+Shell commands of actions, run over a long-lived `adb shell` session.
+
+Starting adb for every command costs more than most commands themselves.
+The session's shell reads commands from stdin, every command is followed by
+printing a marker with its exit status, so its output ends where the marker
+is. Commands of a batch are written at once, then the markers are read.
+"""
+
+from uiautomator import Adb
+from dataclasses import dataclass
+from threading import Lock, Thread
+from typing import Callable, Sequence
+import logging
+import os
+import queue
+import re
+import secrets
+import shlex
+import subprocess
+import time
+
+
+logger = logging.getLogger("roboflow.adb_shell")
+
+
+class AdbSessionError(Exception):
+    """ Session died or didn't answer in time, it can't be used anymore """
+
+    def __init__(self, message: str, results: list["CommandResult"]):
+        super().__init__(message)
+        self.results = results   # of the commands completed before
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    status: int
+    output: str
+
+
+def input_text_command(text: str) -> str:
+    # "input text" ends the text at the first space, %s types one
+    return "input text " + shlex.quote(text.replace(" ", "%s"))
+
+
+def run_app_command(package_name: str) -> str:
+    return (
+        f"monkey -p {shlex.quote(package_name)} "
+        "-c android.intent.category.LAUNCHER 1"
+    )
+
+
+def get_shell_args(adb: Adb) -> list[str]:
+    """ Command line of `adb shell` for the device of adb """
+    return [adb.adb(), *adb.adbHostPortOptions,
+            "-s", adb.device_serial(), "shell"]
+
+
+class AdbShellSession:
+    def __init__(self, args: list[str], timeout: float = 10.0):
+        """
+        Args:
+            args (list[str]): Command line starting the shell.
+            timeout (float): Seconds a command may take.
+        """
+        self._timeout = timeout
+        self._lock = Lock()
+        self._marker = f"__roboflow_{secrets.token_hex(8)}__".encode()
+        self._done = re.compile(
+            b"\n" + re.escape(self._marker) + rb" (-?\d+)\n"
+        )
+        self._buffer = b""
+
+        self._process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        )
+        # reading in a thread keeps the pipe drained, and allows timeouts
+        self._chunks = queue.Queue[bytes | None]()
+        self._reader = Thread(
+            target=self._read, name="adb-shell-reader", daemon=True
+        )
+        self._reader.start()
+
+        # command errors come before their markers, not somewhere after
+        self._write(b"exec 2>&1\n")
+
+    @property
+    def alive(self) -> bool:
+        return self._process.poll() is None
+
+    def run(self, command: str) -> CommandResult:
+        return self.run_batch([command])[0]
+
+    def run_batch(self, commands: Sequence[str]) -> list[CommandResult]:
+        """ Runs commands in order, waits for all of them.
+
+        Raises:
+            AdbSessionError: session died, the session is closed.
+        """
+        with self._lock:
+            script = b"".join(
+                command.encode() + b"\nprintf '\\n%s %d\\n' " +
+                self._marker + b" $?\n"
+                for command in commands
+            )
+            results = list[CommandResult]()
+            try:
+                self._write(script)
+                for _ in commands:
+                    results.append(self._read_result())
+            except AdbSessionError as e:
+                self._kill()
+                raise AdbSessionError(str(e), results) from e
+            return results
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self._write(b"exit\n")
+                self._process.stdin.close()
+                self._process.wait(timeout=self._timeout)
+            except (AdbSessionError, subprocess.TimeoutExpired):
+                pass
+        self._kill()
+
+    def _write(self, data: bytes) -> None:
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise AdbSessionError(f"session is closed: {e}", []) from e
+
+    def _read_result(self) -> CommandResult:
+        deadline = time.monotonic() + self._timeout
+        while True:
+            match = self._done.search(self._buffer)
+            if match is not None:
+                output = self._buffer[:match.start()]
+                self._buffer = self._buffer[match.end():]
+                return CommandResult(
+                    status=int(match.group(1)),
+                    output=output.decode('utf-8', errors='replace'),
+                )
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AdbSessionError("command timed out", [])
+            try:
+                chunk = self._chunks.get(timeout=remaining)
+            except queue.Empty:
+                raise AdbSessionError("command timed out", []) from None
+            if chunk is None:
+                raise AdbSessionError(
+                    f"session exited with {self._process.wait()}", []
+                )
+            self._buffer += chunk
+
+    def _read(self) -> None:
+        stdout = self._process.stdout
+        while chunk := os.read(stdout.fileno(), 65536):
+            self._chunks.put(chunk)
+        self._chunks.put(None)
+
+    def _kill(self) -> None:
+        if self.alive:
+            self._process.kill()
+        self._process.wait()
+        self._process.stdin.close()
+        # the pipe reaches its end once the process is gone, unless some of
+        # its children still hold it; it's closed only when not read anymore
+        self._reader.join(self._timeout)
+        if not self._reader.is_alive():
+            self._process.stdout.close()
+
+
+class AdbShellTransport:
+    """ Runs commands over AdbShellSession, over a separate adb process for
+    every command once sessions keep dying.
+    """
+
+    def __init__(
+        self,
+        adb: Adb,
+        timeout: float = 10.0,
+        max_sessions: int = 3,
+        session_factory: Callable[[list[str], float], AdbShellSession]
+            = AdbShellSession,
+    ):
+        """
+        Args:
+            timeout (float): Seconds a command may take.
+            max_sessions (int): Sessions started before falling back for
+                                good, 0 to always run separate processes.
+        """
+        self._adb = adb
+        self._timeout = timeout
+        self._sessions_left = max_sessions
+        self._session_factory = session_factory
+        self._session: AdbShellSession | None = None
+
+    def run(self, command: str) -> str:
+        return self.run_batch([command])[0]
+
+    def run_batch(self, commands: Sequence[str]) -> list[str]:
+        """ Runs commands in order.
+
+        A command that was sent to a session which died before answering
+        is run again, so it may run twice.
+
+        Returns:
+            Outputs of the commands.
+        """
+        results = list[CommandResult]()
+        session = self._get_session()
+        if session is not None:
+            try:
+                results = session.run_batch(commands)
+            except AdbSessionError as e:
+                logger.warning(f"Shell session died: {e}, "
+                               "running the rest as separate adb processes")
+                self._session = None
+                results = e.results
+
+        results += [self._run_process(c) for c in commands[len(results):]]
+        for command, result in zip(commands, results):
+            if result.status != 0:
+                logger.warning(f"{command!r} exited with {result.status}: "
+                               f"{result.output.strip()}")
+        return [result.output for result in results]
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _get_session(self) -> AdbShellSession | None:
+        if self._session is not None and not self._session.alive:
+            self._session = None
+        if self._session is None and self._sessions_left > 0:
+            self._sessions_left -= 1
+            try:
+                self._session = self._session_factory(
+                    get_shell_args(self._adb), self._timeout
+                )
+            except (OSError, AdbSessionError) as e:
+                logger.warning(f"Shell session can't be started: {e}")
+        return self._session
+
+    def _run_process(self, command: str) -> CommandResult:
+        # raw_cmd goes through the local shell on POSIX
+        if os.name != "nt":
+            command = shlex.quote(command)
+        process = self._adb.cmd("shell", command)
+        try:
+            output, errors = process.communicate(timeout=self._timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            output, errors = process.communicate()
+        return CommandResult(
+            status=process.returncode,
+            output=(output + errors).decode('utf-8', errors='replace'),
+        )
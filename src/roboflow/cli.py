@@ -0,0 +1,164 @@
+"""
+Headless scenario runner, imports neither Qt nor the editor.
+
+    python -m roboflow run project.xml --scenario NAME --device SERIAL...
+
+Exit status is EXIT_PASSED if the scenario passed on every device,
+EXIT_FAILED if it failed on some, EXIT_CRASHED if execution crashed on
+some, EXIT_USAGE on bad arguments and EXIT_INVALID if the project or the
+scenario can't be run at all.
+"""
+
+from scenario.models import Project, Scenario
+from scenario.codec import InvalidXmlData
+from scenario.binary import (
+    InvalidBinaryData, default_binary_codec, is_binary_file,
+)
+from scenario.loader import InvalidProjectFile, load_project
+from roboflow.plan import InvalidScenario
+from roboflow.runner import RunSummary, run_on_devices
+from roboflow.xpath import InvalidXPath
+from roboflow.wait import WaitPolicy
+from dataclasses import asdict
+import argparse
+import json
+import logging
+import os
+import sys
+
+
+EXIT_PASSED = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2      # as argparse exits with
+EXIT_INVALID = 3
+EXIT_CRASHED = 4
+
+logger = logging.getLogger("roboflow")
+
+
+class ScenarioNotFound(Exception):
+    pass
+
+
+def open_project(file_path: str | os.PathLike) -> Project:
+    """ Opens project in XML or the binary format """
+
+    if is_binary_file(file_path):
+        with open(file_path, 'rb') as file:
+            return default_binary_codec.loads(Project, file.read())
+    return load_project(file_path)
+
+
+def find_scenario(project: Project, name: str) -> Scenario:
+    """ First scenario with the name.
+
+    Raises:
+        ScenarioNotFound: project has no such scenario.
+    """
+    for scenario in project.scenaries:
+        if scenario.name == name:
+            return scenario
+    raise ScenarioNotFound(f"no scenario named {name!r}")
+
+
+def get_exit_code(summary: RunSummary) -> int:
+    if any(r.error is not None for r in summary.results):
+        return EXIT_CRASHED
+    return EXIT_PASSED if summary.success else EXIT_FAILED
+
+
+def write_result(file_path: str | os.PathLike, result: dict) -> None:
+    with open(file_path, 'w', encoding='utf-8') as file:
+        json.dump(result, file, ensure_ascii=False, indent=2)
+        file.write("\n")
+
+
+def run(args: argparse.Namespace) -> int:
+    # what is written if the run is interrupted
+    result = {
+        "project": args.project,
+        "scenario": args.scenario,
+        "success": False,
+        "exit_code": EXIT_CRASHED,
+        "devices": [],
+    }
+    try:
+        project = open_project(args.project)
+        scenario = find_scenario(project, args.scenario)
+        summary = run_on_devices(
+            scenario=scenario,
+            serials=args.devices,
+            wait_policy=WaitPolicy(timeout=args.timeout),
+        )
+    except (
+        OSError, SyntaxError, InvalidProjectFile, InvalidBinaryData,
+        InvalidXmlData, ScenarioNotFound, InvalidScenario, InvalidXPath,
+    ) as e:
+        print(f"roboflow: {e}", file=sys.stderr)
+        result.update(exit_code=EXIT_INVALID, error=str(e))
+    except Exception as e:
+        logger.exception("Run crashed")
+        result.update(error=f"{type(e).__name__}: {e}")
+    else:
+        result.update(
+            success=summary.success,
+            exit_code=get_exit_code(summary),
+            duration=summary.duration,
+            devices=[asdict(r) for r in summary.results],
+        )
+        for device_result in summary.results:
+            status = "passed" if device_result.success else "failed"
+            error = device_result.error
+            print(f"{device_result.serial}: {status} "
+                  f"in {device_result.duration:.1f}s"
+                  + (f" ({error})" if error is not None else ""))
+    finally:
+        if args.result is not None:
+            write_result(args.result, result)
+    return result["exit_code"]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="roboflow",
+        description="Run scenaries without the editor",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true",
+        help="log every state transition",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="run a scenario on devices concurrently",
+    )
+    run_parser.add_argument("project", help="project file, XML or binary")
+    run_parser.add_argument("--scenario", required=True, help="scenario name")
+    run_parser.add_argument(
+        "--device", dest="devices", metavar="SERIAL", nargs="+",
+        action="extend", required=True, help="serials of devices",
+    )
+    run_parser.add_argument(
+        "--timeout", type=float, default=WaitPolicy.timeout,
+        help="seconds to wait for the next state (default: %(default)s)",
+    )
+    run_parser.add_argument(
+        "--result", metavar="PATH",
+        help="write results as JSON to the file",
+    )
+    run_parser.set_defaults(handler=run)
+
+    args = parser.parse_args(argv)
+
+    # "roboflow" logger lets everything through, so the handler filters
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(name)s %(levelname)s: %(message)s"
+    ))
+    logging.basicConfig(handlers=[handler])
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Warm device connections.
+
+Starting the uiautomator server and forwarding its port takes seconds, so
+connections are kept between runs, one per serial. A connection is checked
+before it's handed out, unless it has been checked recently, and is set up
+again if the server doesn't respond.
+"""
+
+from uiautomator import Adb, Device
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Iterator
+import logging
+import time
+
+
+logger = logging.getLogger("roboflow.devices")
+
+
+class DeviceUnavailable(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    serial: str
+    state: str   # as adb reports it, "device" once it's usable
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "device"
+
+
+class _Connection:
+    def __init__(self, serial: str, device: Device):
+        self.serial = serial
+        self.device = device
+        self.checked_at: float | None = None   # None until it has responded
+        self.lock = Lock()   # held by the run using the device
+
+
+class DevicePool:
+    def __init__(
+        self,
+        device_factory: Callable[[str], Device] = Device,
+        adb_factory: Callable[[], Adb] = Adb,
+        check_interval: float = 30.0,
+        max_reconnects: int = 2,
+    ):
+        """
+        Args:
+            check_interval (float): Seconds a responded connection is handed
+                                    out without checking it again.
+            max_reconnects (int): Attempts to set the connection up again
+                                  before the device is given up on.
+        """
+        self._device_factory = device_factory
+        self._adb_factory = adb_factory
+        self._check_interval = check_interval
+        self._max_reconnects = max_reconnects
+
+        self._lock = Lock()
+        self._connections = dict[str, _Connection]()
+        self._executor = ThreadPoolExecutor(thread_name_prefix="device-pool")
+
+    def list_devices(self) -> list[DeviceInfo]:
+        """ Devices attached to adb, sorted by serial.
+
+        Raises:
+            DeviceUnavailable: adb isn't working.
+        """
+        try:
+            devices = self._adb_factory().devices()
+        except (OSError, ValueError) as e:
+            raise DeviceUnavailable(f"adb is not working: {e}") from e
+        return sorted(
+            (DeviceInfo(serial=serial, state=state.strip())
+             for serial, state in devices.items()),
+            key=lambda info: info.serial,
+        )
+
+    def get_default_serial(self) -> str:
+        """ Serial of the only ready device.
+
+        Raises:
+            DeviceUnavailable: there are none or several of them.
+        """
+        ready = [info.serial for info in self.list_devices() if info.is_ready]
+        if len(ready) != 1:
+            raise DeviceUnavailable(
+                f"expected a single ready device, found {len(ready)}"
+            )
+        return ready[0]
+
+    @contextmanager
+    def lease(self, serial: str | None = None) -> Iterator[Device]:
+        """ Responding device for exclusive use by a run.
+
+        Waits while the device is used by another run. The connection is
+        checked on the next lease if the run raises.
+
+        Args:
+            serial (str | None): Device serial, the only ready device if None.
+
+        Raises:
+            DeviceUnavailable: connection can't be set up.
+        """
+        if serial is None:
+            serial = self.get_default_serial()
+        connection = self._get_connection(serial)
+
+        with connection.lock:
+            self._ensure_alive(connection)
+            try:
+                yield connection.device
+            except BaseException:
+                connection.checked_at = None
+                raise
+
+    def warm_up(self, serial: str) -> Future:
+        """ Sets the connection up in background, before the first run """
+        def warm_up() -> None:
+            try:
+                with self.lease(serial):
+                    pass
+            except DeviceUnavailable as e:
+                logger.error(str(e))
+                raise
+        return self._executor.submit(warm_up)
+
+    def close(self) -> None:
+        """ Stops servers of all devices, waits for their runs to end """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            with connection.lock:
+                self._stop(connection)
+
+    def _get_connection(self, serial: str) -> _Connection:
+        with self._lock:
+            connection = self._connections.get(serial)
+            if connection is None:
+                connection = _Connection(serial, self._device_factory(serial))
+                self._connections[serial] = connection
+            return connection
+
+    def _ensure_alive(self, connection: _Connection) -> None:
+        if connection.checked_at is not None and \
+                time.monotonic() - connection.checked_at < self._check_interval:
+            return
+
+        error = None
+        for attempt in range(self._max_reconnects + 1):
+            try:
+                if attempt:
+                    # port forward or the server process may be stale
+                    logger.info(f"{connection.serial}: reconnecting")
+                    self._stop(connection)
+                    connection.device = self._device_factory(connection.serial)
+                if not connection.device.server.alive:
+                    connection.device.server.start()
+                connection.checked_at = time.monotonic()
+                return
+            except Exception as e:
+                logger.warning(f"{connection.serial}: not responding: {e!r}")
+                error = e
+
+        connection.checked_at = None
+        raise DeviceUnavailable(
+            f"{connection.serial}: connection failed"
+        ) from error
+
+    @staticmethod
+    def _stop(connection: _Connection) -> None:
+        try:
+            connection.device.server.stop()
+        except Exception as e:
+            logger.debug(f"{connection.serial}: stopping failed: {e!r}")
@@ -3,8 +3,19 @@ from scenario.models import (
     ClickCoordsAction, ClickTextAction, WaitAction, WriteAction, RunAppAction
 )
 from uiautomator import Device
-from time import sleep
-from lxml import etree
+from time import sleep, monotonic
+from threading import Event
+from contextlib import closing
+from typing import Callable
+
+from roboflow.snapshot import Snapshot
+from roboflow.xpath import compile_xpath
+from roboflow.plan import ExecutionPlan, compile_plan
+from roboflow.wait import WaitPolicy
+from roboflow.adb_shell import (
+    AdbShellTransport, input_text_command, run_app_command,
+)
+from roboflow.actions import ActionStep, ShellBatch, compile_actions
 
 import logging
 
@@ -12,33 +23,57 @@ logger = logging.getLogger("roboflow")
 logger.setLevel(logging.DEBUG)
 
 
+class ExecutionCancelled(Exception):
+    pass
+
+
+def _sleep(seconds: float, stop_event: Event | None) -> None:
+    """ Sleeps, raises ExecutionCancelled as soon as stop_event is set """
+
+    if stop_event is None:
+        sleep(seconds)
+    elif stop_event.wait(seconds):
+        raise ExecutionCancelled()
+
+
+def _get_shell(
+    device: Device,
+    shell: AdbShellTransport | None,
+) -> AdbShellTransport:
+    if shell is None:
+        return AdbShellTransport(device.server.adb, max_sessions=0)
+    return shell
+
+
 def execute_action(
     device: Device,
-    action: Action
+    action: Action,
+    stop_event: Event | None = None,
+    shell: AdbShellTransport | None = None,
 ):
+    """
+    Args:
+        shell (AdbShellTransport | None): Runs shell commands of the action,
+                                          separate adb processes if None.
+    """
     if isinstance(action, ClickCoordsAction):
         device.click(action.coords.x, action.coords.y)
     elif isinstance(action, ClickTextAction):
         device(text=action.text).click()
     elif isinstance(action, WaitAction):
-        sleep(action.duration_ms / 1000)
-    elif isinstance(action, WriteAction):
-        device.server.adb.raw_cmd(f"shell input text {action.text}")
-    elif isinstance(action, RunAppAction):
-        device.server.adb.raw_cmd((
-            "shell monkey "
-            f"-p {action.package_name} "
-            "-c android.intent.category.LAUNCHER 1"
-        ))
+        _sleep(action.duration_ms / 1000, stop_event)
+    elif isinstance(action, (WriteAction, RunAppAction)):
+        shell = _get_shell(device, shell)
+        if isinstance(action, WriteAction):
+            shell.run(input_text_command(action.text))
+        else:
+            shell.run(run_app_command(action.package_name))
 
 def check_statements(
-    device: Device,
-    statements: list[State]
+    snapshot: Snapshot,
+    statements: list[Statement]
 ) -> bool:
-    xml = device.dump().encode('utf-8')
-    with open('a.xml', 'wb') as f:
-        f.write(xml)
-    root = etree.fromstring(xml)
+    root = snapshot.root
 
     result = True
     for statement in statements:
@@ -46,14 +81,14 @@ def check_statements(
         value2 = None
 
         if statement.value_type_1 is ValueType.XPATH:
-            elements = root.xpath(statement.value1)
+            elements = compile_xpath(statement.value1)(root)
             if elements:
                 value1 = elements[0]
         elif statement.value_type_1 is ValueType.CONST:
             value1 = statement.value1
 
         if statement.value_type_2 is ValueType.XPATH:
-            elements = root.xpath(statement.value2)
+            elements = compile_xpath(statement.value2)(root)
             if elements:
                 value2 = elements[0]
         elif statement.value_type_2 is ValueType.CONST:
@@ -76,65 +111,176 @@ def check_statements(
     return result
 
 
+def execute_step(
+    device: Device,
+    step: ActionStep,
+    stop_event: Event | None = None,
+    shell: AdbShellTransport | None = None,
+) -> None:
+    if isinstance(step, ShellBatch):
+        _get_shell(device, shell).run_batch(step.commands)
+    else:
+        execute_action(
+            device=device, action=step.action, stop_event=stop_event,
+            shell=shell,
+        )
+
+
 def execute_state(
     device: Device,
     state: State, 
+    stop_event: Event | None = None,
+    shell: AdbShellTransport | None = None,
+    steps: tuple[ActionStep, ...] | None = None,
+    logger: logging.Logger = logger,
+) -> bool:
+    """ Runs actions of the state, batched by roboflow.actions.
+
+    Args:
+        steps: compiled actions of the state, compiled here if None.
+        logger: logger of the device, as execute_plan is given.
+
+    Returns:
+        True if at least one action has been run on the device.
+    """
+
+    logger.debug(f"Entering state: {state.name}")
+    if steps is None:
+        steps = compile_actions(state.actions)
+    for step in steps:
+        if stop_event is not None and stop_event.is_set():
+            raise ExecutionCancelled()
+        execute_step(
+            device=device, step=step, stop_event=stop_event, shell=shell,
+        )
+    return len(state.actions) > 0
+
+
+def find_transition(
+    snapshot: Snapshot,
+    candidates: tuple[State, ...],
+) -> State | None:
+    for candidate in candidates:
+        if check_statements(snapshot, candidate.statements):
+            return candidate
+    return None
+
+
+def wait_for_transition(
+    snapshot: Snapshot,
+    candidates: tuple[State, ...],
+    timeout: float,
+    policy: WaitPolicy,
+    stop_event: Event | None = None,
+) -> State | None:
+    """ Polls the device until any candidate matches or timeout expires """
+
+    deadline = monotonic() + timeout
+    interval = policy.initial_interval
+    while True:
+        next_state = find_transition(snapshot, candidates)
+        remaining = deadline - monotonic()
+        if next_state is not None or remaining <= 0:
+            return next_state
+
+        _sleep(min(interval, remaining), stop_event)
+        interval = policy.next_interval(interval, snapshot.capture_duration)
+        snapshot.invalidate()
+
+
+def execute_plan(
+    plan: ExecutionPlan,
+    device: Device,
+    logger: logging.Logger = logger,
+    wait_policy: WaitPolicy | None = None,
+    stop_event: Event | None = None,
+    on_state_entered: Callable[[State], None] | None = None,
+    shell: AdbShellTransport | None = None,
 ) -> bool:
+    """ Runs the plan on the device.
+
+    Candidates are checked once per transition unless `wait_policy` is
+    given, in which case the device is polled until some candidate matches.
+    Shell commands go through `shell`, or a session opened for the run.
+
+    Raises:
+        ExecutionCancelled: `stop_event` has been set.
+    """
+    if shell is None:
+        with closing(AdbShellTransport(device.server.adb)) as shell:
+            return execute_plan(
+                plan=plan,
+                device=device,
+                logger=logger,
+                wait_policy=wait_policy,
+                stop_event=stop_event,
+                on_state_entered=on_state_entered,
+                shell=shell,
+            )
+
+    # the hierarchy is dumped once per transition and shared by all candidates
+    snapshot = Snapshot(device)
+
+    state = plan.initial_state
+    while True:
+        if on_state_entered is not None:
+            on_state_entered(state)
+
+        if execute_state(
+            device=device,
+            state=state,
+            stop_event=stop_event,
+            shell=shell,
+            steps=plan.get_steps(state),
+            logger=logger,
+        ):
+            snapshot.invalidate()
+
+        candidates = plan.get_candidates(state)
+        if len(candidates) == 0:
+            logger.info("Success")
+            return True
+
+        if wait_policy is None:
+            next_state = find_transition(snapshot, candidates)
+        else:
+            next_state = wait_for_transition(
+                snapshot=snapshot,
+                candidates=candidates,
+                timeout=wait_policy.get_timeout(state.state_id),
+                policy=wait_policy,
+                stop_event=stop_event,
+            )
+
+        if next_state is None:
+            logger.info("Failed")
+            return False
 
-    print(state)
-    for action in state.actions:
-        execute_action(device=device, action=action)
+        state = next_state
+        logger.info(f"Next state: {state.name}")
 
 
 def execute_scenario(
     scenario: Scenario,
     device: Device | None = None,
-):
+    logger: logging.Logger = logger,
+    wait_policy: WaitPolicy | None = None,
+    stop_event: Event | None = None,
+    on_state_entered: Callable[[State], None] | None = None,
+) -> bool:
     logger.info("Starting")
 
+    # fail on invalid scenario before the first device action
+    plan = compile_plan(scenario)
+
     if device is None:
         device = Device()
 
-    states = scenario.states
-    initial_state = [
-        s for s in states 
-        if s.state_id == scenario.initial_state_id
-    ][0]
-
-    state = initial_state
-    while state is not None:
-        execute_state(device, state)
-
-        if len(state.next_states) == 0:
-            logger.info("Success")
-            break
-        next_states = [s for s in states if s.state_id in state.next_states]
-        state_found = False
-        for st in next_states:
-            correct = check_statements(device, st.statements)
-            if correct:
-                state = st
-                logger.info(f"Next state: {st.name}")
-                state_found = True
-                break
-        
-        if not state_found:
-            logger.info("Failed")
-            break
-
-if __name__ == "__main__":
-   device = Device()
-   statements = [
-     Statement(
-        value_type_1=ValueType.CONST,
-        value1="Настройки",
-        value_type_2=ValueType.XPATH,
-        value2="//node[@text='Настройки']/@text",
-        condition=Condition.EQUAL
-     )
-   ]
-   res = check_statements(
+    return execute_plan(
+        plan=plan,
         device=device,
-        statements=statements,
-   )
-   print(res)
+        logger=logger,
+        wait_policy=wait_policy,
+        stop_event=stop_event,
+        on_state_entered=on_state_entered,
+    )
@@ -0,0 +1,81 @@
+from scenario.models import Scenario, State
+from roboflow.xpath import compile_scenario_xpaths
+from roboflow.actions import ActionStep, compile_actions
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+
+class InvalidScenario(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """ Immutable, pre-resolved form of a scenario used by the executor.
+
+    Candidates of every state are ordered by `State.priority` (lower value
+    is checked first), ties are broken by `state_id`.
+    """
+    name: str
+    initial_state: State
+    states: Mapping[int, State]
+    transitions: Mapping[int, tuple[State, ...]]
+    steps: Mapping[int, tuple[ActionStep, ...]]   # actions of the states
+
+    def get_candidates(self, state: State) -> tuple[State, ...]:
+        return self.transitions[state.state_id]
+
+    def get_steps(self, state: State) -> tuple[ActionStep, ...]:
+        return self.steps[state.state_id]
+
+
+def compile_plan(scenario: Scenario) -> ExecutionPlan:
+    """ Validates the scenario and builds its execution plan.
+
+    Raises:
+        InvalidScenario: duplicated state ids, unknown initial state or
+                         dangling `next_states` ids.
+        InvalidXPath: some statement contains malformed expression.
+    """
+    states = dict[int, State]()
+    for state in scenario.states:
+        if state.state_id in states:
+            raise InvalidScenario(
+                f"Scenario \"{scenario.name}\": "
+                f"duplicated state id {state.state_id}"
+            )
+        states[state.state_id] = state
+
+    initial_state = states.get(scenario.initial_state_id)
+    if initial_state is None:
+        raise InvalidScenario(
+            f"Scenario \"{scenario.name}\": "
+            f"unknown initial state id {scenario.initial_state_id}"
+        )
+
+    transitions = dict[int, tuple[State, ...]]()
+    for state in states.values():
+        dangling = [i for i in state.next_states if i not in states]
+        if dangling:
+            raise InvalidScenario(
+                f"Scenario \"{scenario.name}\": state \"{state.name}\" "
+                f"({state.state_id}) refers to unknown states {sorted(dangling)}"
+            )
+        transitions[state.state_id] = tuple(sorted(
+            (states[i] for i in state.next_states),
+            key=lambda s: (s.priority, s.state_id),
+        ))
+
+    compile_scenario_xpaths(scenario)
+
+    return ExecutionPlan(
+        name=scenario.name,
+        initial_state=initial_state,
+        states=MappingProxyType(states),
+        transitions=MappingProxyType(transitions),
+        steps=MappingProxyType({
+            state_id: compile_actions(state.actions)
+            for state_id, state in states.items()
+        }),
+    )
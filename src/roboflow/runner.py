@@ -0,0 +1,104 @@
+from scenario.models import Scenario
+from roboflow.main import execute_plan, logger
+from roboflow.plan import compile_plan, ExecutionPlan
+from roboflow.wait import WaitPolicy
+from uiautomator import Device
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+import time
+
+
+@dataclass(frozen=True)
+class DeviceResult:
+    serial: str
+    success: bool
+    duration: float   # seconds
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class RunSummary:
+    scenario_name: str
+    results: tuple[DeviceResult, ...]
+    duration: float   # seconds
+
+    @property
+    def passed(self) -> list[DeviceResult]:
+        return [r for r in self.results if r.success]
+
+    @property
+    def failed(self) -> list[DeviceResult]:
+        return [r for r in self.results if not r.success]
+
+    @property
+    def success(self) -> bool:
+        return len(self.failed) == 0
+
+
+def _run_on_device(
+    plan: ExecutionPlan,
+    serial: str,
+    device_factory: Callable[[str], Device],
+    wait_policy: WaitPolicy | None,
+) -> DeviceResult:
+    # every device logs through its own child of the "roboflow" logger
+    device_logger = logger.getChild(serial)
+    started_at = time.monotonic()
+    try:
+        device_logger.info("Starting")
+        success = execute_plan(
+            plan=plan,
+            device=device_factory(serial),
+            logger=device_logger,
+            wait_policy=wait_policy,
+        )
+        error = None
+    except Exception as e:
+        device_logger.exception("Execution crashed")
+        success = False
+        error = repr(e)
+
+    return DeviceResult(
+        serial=serial,
+        success=success,
+        duration=time.monotonic() - started_at,
+        error=error,
+    )
+
+
+def run_on_devices(
+    scenario: Scenario,
+    serials: list[str],
+    device_factory: Callable[[str], Device] = Device,
+    wait_policy: WaitPolicy | None = None,
+) -> RunSummary:
+    """ Executes the scenario concurrently, one worker per device.
+
+    Args:
+        scenario (Scenario): Scenario to be executed.
+        serials (list[str]): Serials of devices to run the scenario on.
+        device_factory (Callable): Creates device from its serial.
+        wait_policy (WaitPolicy | None): Polling settings of transitions,
+                                         single-shot checks if None.
+
+    Returns:
+        RunSummary: per-device results in the order of `serials`.
+    """
+    plan = compile_plan(scenario)
+
+    started_at = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(len(serials), 1)) as pool:
+        futures = [
+            pool.submit(
+                _run_on_device, plan, serial, device_factory, wait_policy
+            )
+            for serial in serials
+        ]
+        results = tuple(f.result() for f in futures)
+
+    return RunSummary(
+        scenario_name=scenario.name,
+        results=results,
+        duration=time.monotonic() - started_at,
+    )
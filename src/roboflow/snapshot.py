@@ -0,0 +1,36 @@
+from uiautomator import Device
+from lxml import etree
+import time
+
+
+class Snapshot:
+    """ Parsed UI hierarchy of the device, shared between statement checks.
+
+    The hierarchy is dumped lazily on first access and reused until
+    `invalidate` is called, i.e. until an action has been run on the device.
+    """
+
+    def __init__(self, device: Device):
+        self._device = device
+        self._root: etree._Element | None = None
+        self.capture_duration: float = 0   # seconds the last dump took
+
+    @property
+    def root(self) -> etree._Element:
+        if self._root is None:
+            self.capture()
+        return self._root
+
+    @property
+    def is_stale(self) -> bool:
+        return self._root is None
+
+    def capture(self) -> etree._Element:
+        started_at = time.monotonic()
+        xml = self._device.dump().encode('utf-8')
+        self._root = etree.fromstring(xml)
+        self.capture_duration = time.monotonic() - started_at
+        return self._root
+
+    def invalidate(self) -> None:
+        self._root = None
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from typing import Mapping
+
+
+@dataclass(frozen=True)
+class WaitPolicy:
+    """ Polling settings used while waiting for any candidate state to match.
+
+    The UI is re-dumped after `initial_interval` seconds, then the interval
+    grows by `backoff` up to `max_interval`. Interval never gets shorter than
+    the last dump took, so slow devices are not flooded with dumps.
+    """
+    timeout: float = 10.0   # seconds
+    initial_interval: float = 0.1
+    max_interval: float = 2.0
+    backoff: float = 1.5
+    state_timeouts: Mapping[int, float] = field(default_factory=dict)
+
+    def get_timeout(self, state_id: int) -> float:
+        return self.state_timeouts.get(state_id, self.timeout)
+
+    def next_interval(self, interval: float, capture_duration: float) -> float:
+        return min(
+            max(interval * self.backoff, capture_duration),
+            self.max_interval,
+        )
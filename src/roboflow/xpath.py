@@ -0,0 +1,45 @@
+from scenario.models import Scenario, ValueType
+from functools import lru_cache
+from lxml import etree
+
+
+XPATH_CACHE_SIZE = 1024
+
+
+class InvalidXPath(Exception):
+    pass
+
+
+@lru_cache(maxsize=XPATH_CACHE_SIZE)
+def compile_xpath(expression: str) -> etree.XPath:
+    """ Returns compiled XPath, expressions are cached in a bounded LRU.
+
+    Raises:
+        InvalidXPath: expression is malformed.
+    """
+    try:
+        return etree.XPath(expression)
+    except etree.XPathSyntaxError as e:
+        raise InvalidXPath(f"Malformed XPath \"{expression}\": {e}") from e
+
+
+def compile_scenario_xpaths(scenario: Scenario) -> None:
+    """ Compiles every XPath statement of the scenario ahead of execution.
+
+    Raises:
+        InvalidXPath: some statement contains malformed expression.
+    """
+    for state in scenario.states:
+        for statement in state.statements:
+            for value_type, value in (
+                (statement.value_type_1, statement.value1),
+                (statement.value_type_2, statement.value2),
+            ):
+                if value_type is not ValueType.XPATH:
+                    continue
+                try:
+                    compile_xpath(value)
+                except InvalidXPath as e:
+                    raise InvalidXPath(
+                        f"State \"{state.name}\" ({state.state_id}): {e}"
+                    ) from e
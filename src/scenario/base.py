@@ -1,8 +1,13 @@
-from typing import TypeVar
+from typing import TypeVar, Iterator, Any
 from abc import ABC, abstractmethod, abstractclassmethod, ABCMeta
 import xml.etree.ElementTree as ET
 from enum import Enum
 
+from scenario.codec import (
+    FieldKind, FieldSpec, InvalidXmlData, default_codec, get_line,
+    get_text_decoder,
+)
+
 
 TBaseModel = TypeVar("TBaseModel", bound="BaseModel")
 TXMLModel  = TypeVar("TXMLModel", bound="XMLModel")
@@ -15,7 +20,14 @@ class DisallowedType(Exception):
     pass
 
 
+class UnknownTag(InvalidXmlData):
+    pass
+
+
 class InitMeta(type):
+    # xml tag -> model class, filled on class creation
+    _registry = dict[str, type]()
+
     def __new__(mcs, name, bases, namespace, **kwargs):
 
         basic_types = {str, int, list, set, Enum}
@@ -33,15 +45,42 @@ class InitMeta(type):
                 f" Only {[i.__name__ for i in basic_types.union(meta_types)]} are allowed."
             )
 
-        def __init__(self, **kwargs):
+        # resolved once here, so (de)serializers don't inspect types per element
+        own_specs = {
+            field: mcs._resolve_field_spec(field, t)
+            for field, t in annotations.items()
+            if not field.startswith('_')
+        }
+        field_specs = dict()
+        for base in reversed(bases):
+            field_specs.update(getattr(base, '_field_specs', {}))
+        field_specs.update(own_specs)
+        field_names = tuple(field_specs)
+
+        def __init__(self, *args, **kwargs):
+            if args:
+                if len(args) > len(field_names):
+                    raise TypeError(
+                        f"{name}() takes {len(field_names)} positional"
+                        f" arguments but {len(args)} were given"
+                    )
+                for field in field_names[:len(args)]:
+                    if field in kwargs:
+                        raise TypeError(
+                            f"{name}() got multiple values for argument"
+                            f" '{field}'"
+                        )
+                kwargs.update(zip(field_names, args))
             for field, value in kwargs.items():
+                if field not in field_specs:
+                    raise TypeError(
+                        f"{name}() got an unexpected keyword argument '{field}'"
+                    )
                 setattr(self, field, value)
 
         def __str__(self) -> str:
             result = self.__class__.__name__ + '('
-            for field, value in self.__dict__.items():
-                if field.startswith('_'):
-                    continue
+            for field, value in self._iter_set_fields():
                 result += f"{field}={value},"
             result += ')'
             return result
@@ -55,10 +94,43 @@ class InitMeta(type):
         if '__str__' not in namespace:
             namespace['__str__'] = __str__
 
+        # instances keep fields in slots instead of per-instance __dict__
+        namespace['__slots__'] = \
+            tuple(own_specs) + tuple(namespace.get('__slots__', ()))
+
         cls = super().__new__(mcs, name, bases, namespace)
+
+        cls._field_specs = field_specs
+        cls._xml_tag = namespace.get('_xml_tag', name)
+        if '_xml_tag' not in namespace:   # aliases don't take the tag over
+            InitMeta._registry[cls._xml_tag] = cls
         
         return cls
 
+    @staticmethod
+    def _resolve_field_spec(name: str, t) -> FieldSpec:
+        if isinstance(t, XmlAttr):
+            kind = FieldKind.ATTR
+        elif isinstance(t, Container):
+            kind = FieldKind.MODEL_CONTAINER \
+                if issubclass(t.data_type, XMLSerializable) \
+                else FieldKind.CONTAINER
+        elif issubclass(t, Enum):
+            kind = FieldKind.ENUM
+        elif issubclass(t, XMLSerializable):
+            kind = FieldKind.MODEL
+        else:
+            kind = FieldKind.VALUE
+        return FieldSpec(name=name, kind=kind, field_type=t)
+
+    @staticmethod
+    def get_registered(tag: str) -> type | None:
+        return InitMeta._registry.get(tag)
+
+    @staticmethod
+    def get_registered_tags() -> list[str]:
+        return list(InitMeta._registry)
+
 class Container:
     def __init__(self, container_type: type, data_type: type):
         self.container_type = container_type
@@ -79,17 +151,21 @@ class ABCInitMeta(ABCMeta, InitMeta):   # resolving metaclass conflict
 class BaseModel(metaclass=ABCInitMeta):
     @classmethod
     def get_fields(cls) -> dict[str, type]:
-        annotations = cls.__annotations__
-
-        fields = {
-            name: field_type for name, field_type in annotations.items()
-            if not name.startswith('_')
+        return {
+            name: spec.field_type for name, spec in cls._field_specs.items()
         }
 
-        return fields
+    def _iter_set_fields(self) -> Iterator[tuple[str, Any]]:
+        """ Yields fields which have values, in declaration order """
+        for name in self._field_specs:
+            try:
+                yield name, object.__getattribute__(self, name)
+            except AttributeError:   # unset slot
+                continue
 
 
 class XMLSerializable(ABC):
+    __slots__ = ()
 
     @abstractclassmethod
     def from_xml(cls, data: str) -> TXMLSerializable:
@@ -111,21 +187,31 @@ class XMLSerializable(ABC):
 class XMLModel(BaseModel, XMLSerializable):
     @classmethod
     def from_xml(cls: TXMLModel, data: str, strict: bool = True) -> TXMLModel:
-        root = ET.fromstring(data)
-        return cls._from_xml_element(root)
+        return default_codec.decode(cls, data)
+
 
+    @classmethod
+    def _resolve_xml_class(cls: TXMLModel, root: ET.Element) -> type:
+        """ Returns the class (cls or any of its subclasses) tagged by root.
+
+        Raises:
+            UnknownTag: there is no such class.
+        """
+        if root.tag == cls._xml_tag:
+            return cls
+
+        subclass = InitMeta.get_registered(root.tag)
+        if subclass is None or not issubclass(subclass, cls):
+            raise UnknownTag(
+                f"Unknown tag <{root.tag}>, "
+                f"expected {cls.__name__} or its subclass",
+                get_line(root),
+            )
+        return subclass
 
     @classmethod
     def _from_xml_element(cls: TXMLModel, root: ET.Element) -> TXMLModel:
-        if root.tag != cls.__name__:
-            f = True
-            for subclass in cls.__subclasses__():
-                if root.tag == subclass.__name__:
-                    cls = subclass
-                    f = False
-                    break
-            if f:
-                raise Exception("OOO")
+        cls = cls._resolve_xml_class(root)
 
         fields = cls.get_fields()
         parsed_fields = dict()
@@ -156,7 +242,8 @@ class XMLModel(BaseModel, XMLSerializable):
                 )
 
             else:
-                parsed_fields[child.tag] = field_type(child.text)
+                parsed_fields[child.tag] = \
+                    get_text_decoder(field_type)(child.text)
         
         return cls(**parsed_fields)
 
@@ -176,20 +263,20 @@ class XMLModel(BaseModel, XMLSerializable):
                 )
             else:
                 result.append(
-                    data_type(child.text)
+                    get_text_decoder(data_type)(child.text)
                 )
 
         return result
 
 
     def to_xml(self) -> str:
-        return ET.tostring(self._to_xml_element(), encoding="unicode")
+        return default_codec.encode(self)
 
     def _to_xml_element(self) -> ET.Element:
         fields = self.get_fields()
         data = {
-            k: v for k, v in self.__dict__.items()
-            if not callable(v) and not k.startswith('_')
+            k: v for k, v in self._iter_set_fields()
+            if not callable(v)
         }
 
         root = ET.Element(type(self).__name__)
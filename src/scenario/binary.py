@@ -0,0 +1,375 @@
+"""
+Compact binary form of the models.
+
+The layout is derived from the field specs resolved by `InitMeta`, so field
+names are never written. Every model is stored as its tag index, a bitmask of
+fields which are set (one bit per field of its class, little-endian) and then
+the values of those fields in declaration order. Integers are zigzag varints, floats are little-endian doubles, strings
+are length-prefixed UTF-8.
+
+    data   := MAGIC VERSION tags model
+    tags   := varint(count) str*
+    model  := varint(tag index) mask value*
+"""
+
+from scenario.codec import FieldKind, FieldSpec, default_codec
+from scenario.base import InitMeta
+from enum import Enum
+from typing import Any, Callable
+import os
+import struct
+
+
+MAGIC = b"RFPB"
+VERSION = 1
+
+_DOUBLE = struct.Struct("<d")
+
+
+class InvalidBinaryData(Exception):
+    pass
+
+
+def is_binary(data: bytes) -> bool:
+    return data[:len(MAGIC)] == MAGIC
+
+
+def is_binary_file(file_path: str | os.PathLike) -> bool:
+    with open(file_path, 'rb') as file:
+        return is_binary(file.read(len(MAGIC)))
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+class _Reader:
+    def __init__(self, data: bytes, pos: int):
+        self.data = memoryview(data)
+        self.pos = pos
+
+    def read_varint(self) -> int:
+        data = self.data
+        pos = self.pos
+        byte = data[pos]
+        pos += 1
+        if byte < 0x80:
+            self.pos = pos
+            return byte
+
+        result = byte & 0x7f
+        shift = 7
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                self.pos = pos
+                return result
+            shift += 7
+
+    def read_str(self) -> str:
+        start = self.pos
+        size = self.data[start]
+        if size < 0x80:
+            start += 1
+        else:
+            size = self.read_varint()
+            start = self.pos
+        end = self.pos = start + size
+        return str(self.data[start:end], "utf-8")
+
+    def read_double(self) -> float:
+        value, = _DOUBLE.unpack_from(self.data, self.pos)
+        self.pos += _DOUBLE.size
+        return value
+
+
+# scalar writers take tags too, so they are used as field writers as is
+_Write = Callable[[bytearray, Any, dict | None], None]
+_Read = Callable[[_Reader, list[type]], Any]
+
+
+def _write_int(out: bytearray, value: int) -> None:
+    if 0 <= value < 0x40:
+        out.append(value << 1)
+    else:
+        _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+
+
+def _read_int(reader: _Reader, classes=None) -> int:
+    value = reader.read_varint()
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    data = value.encode("utf-8")
+    if len(data) < 0x80:
+        out.append(len(data))
+    else:
+        _write_varint(out, len(data))
+    out += data
+
+
+def _write_double(out: bytearray, value: float) -> None:
+    out += _DOUBLE.pack(value)
+
+
+def _scalar_codec(scalar_type: type) -> tuple[_Write, _Read]:
+    """ Values are converted by scalar_type exactly as XML codec does """
+
+    if issubclass(scalar_type, Enum):
+        encoded = dict[Enum, bytes]()
+        for member in scalar_type:
+            data = bytearray()
+            _write_str(data, str(member.value))
+            encoded[member] = bytes(data)
+
+        def write_enum(out, value, tags=None):
+            out += encoded[value]
+
+        return (
+            write_enum,
+            lambda reader, classes=None: scalar_type(reader.read_str()),
+        )
+    if issubclass(scalar_type, float):
+        return (
+            lambda out, value, tags=None:
+                _write_double(out, scalar_type(value)),
+            lambda reader, classes=None: scalar_type(reader.read_double()),
+        )
+    if issubclass(scalar_type, int):
+        return (
+            lambda out, value, tags=None: _write_int(out, scalar_type(value)),
+            lambda reader, classes=None: scalar_type(_read_int(reader)),
+        )
+    return (
+        lambda out, value, tags=None: _write_str(out, str(scalar_type(value))),
+        lambda reader, classes=None: scalar_type(reader.read_str()),
+    )
+
+
+def _mask_size(cls: type) -> int:
+    return (len(cls._field_specs) + 7) // 8
+
+
+class BinaryCodec:
+    def __init__(self):
+        self._writers = dict[type, Callable]()
+        self._readers = dict[type, Callable]()
+
+    def dumps(self, obj: Any, all_tags: bool = False) -> bytes:
+        """
+        Args:
+            all_tags: list every registered tag, so the data can be embedded
+                      into other models dumped this way without decoding it.
+        """
+        tags = dict[str, int]()
+        if all_tags:
+            for tag in InitMeta.get_registered_tags():
+                tags[tag] = len(tags)
+        body = bytearray()
+        self._write_model(body, obj, tags)
+
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _write_varint(out, len(tags))
+        for tag in tags:
+            _write_str(out, tag)
+        out += body
+        return bytes(out)
+
+    def loads(self, cls: type, data: bytes) -> Any:
+        """
+        Raises:
+            InvalidBinaryData: data is not in the binary format or corrupted.
+        """
+        if not is_binary(data) or len(data) <= len(MAGIC):
+            raise InvalidBinaryData("Not binary project data")
+        if data[len(MAGIC)] != VERSION:
+            raise InvalidBinaryData(
+                f"Unsupported format version {data[len(MAGIC)]}"
+            )
+
+        try:
+            reader = _Reader(data, len(MAGIC) + 1)
+            classes = [
+                self._resolve_tag(reader.read_str())
+                for _ in range(reader.read_varint())
+            ]
+            obj = self._read_model(reader, cls, classes)
+        except (IndexError, ValueError, struct.error) as e:
+            raise InvalidBinaryData(f"Corrupted data: {e}") from e
+        if reader.pos != len(data):
+            raise InvalidBinaryData("Unexpected data after the model")
+        return obj
+
+    @staticmethod
+    def _resolve_tag(tag: str) -> type:
+        cls = InitMeta.get_registered(tag)
+        if cls is None:
+            raise InvalidBinaryData(f"Unknown model tag {tag!r}")
+        return cls
+
+    def _write_model(self, out: bytearray, obj: Any, tags: dict[str, int]):
+        cls = type(obj)
+        writer = self._writers.get(cls)
+        if writer is None:
+            writer = self._writers[cls] = self._build_writer(cls)
+        writer(out, obj, tags)
+
+    @staticmethod
+    def _embed(out: bytearray, data: bytes, tags: dict[str, int]) -> bool:
+        """ Appends the model of dumped data, if its tag indices match """
+        reader = _Reader(data, len(MAGIC) + 1)
+        for index in range(reader.read_varint()):
+            if tags.setdefault(reader.read_str(), len(tags)) != index:
+                return False
+        out += reader.data[reader.pos:]
+        return True
+
+    def _read_model(self, reader: _Reader, base: type, classes: list[type]):
+        cls = classes[reader.read_varint()]
+        if cls is not base and not issubclass(cls, base):
+            raise InvalidBinaryData(
+                f"{cls.__name__} found where {base.__name__} expected"
+            )
+        read = self._readers.get(cls)
+        if read is None:
+            read = self._readers[cls] = self._build_reader(cls)
+        return read(reader, classes)
+
+    def _build_writer(self, cls: type) -> Callable:
+        # slot descriptors raise AttributeError for unset fields
+        fields = [
+            (getattr(cls, spec.name).__get__, self._field_writer(spec))
+            for spec in cls._field_specs.values()
+        ]
+        tag = cls._xml_tag
+        mask_size = _mask_size(cls)
+        # models backed by already encoded data are written from it
+        get_binary = getattr(cls, '_get_binary_fragment', None)
+        get_fragment = getattr(cls, '_get_xml_fragment', None)
+        write_model = self._write_model
+        resolve_tag = self._resolve_tag
+        embed = self._embed
+        loads = self.loads
+
+        def write(out: bytearray, obj: Any, tags: dict[str, int]) -> None:
+            if get_binary is not None:
+                data = get_binary(obj)
+                if data is not None:
+                    if not embed(out, data, tags):
+                        decoded = loads(resolve_tag(tag), data)
+                        write_model(out, decoded, tags)
+                    return
+            if get_fragment is not None:
+                fragment = get_fragment(obj)
+                if fragment is not None:
+                    decoded = default_codec.decode(resolve_tag(tag), fragment)
+                    return write_model(out, decoded, tags)
+
+            _write_varint(out, tags.setdefault(tag, len(tags)))
+            mask_start = len(out)
+            out += bytes(mask_size)   # known once fields are written
+            mask = 0
+            bit = 1
+            for get_value, write_field in fields:
+                try:
+                    value = get_value(obj)
+                except AttributeError:
+                    bit <<= 1
+                    continue
+                if not callable(value):
+                    write_field(out, value, tags)
+                    mask |= bit
+                bit <<= 1
+            out[mask_start:mask_start + mask_size] = \
+                mask.to_bytes(mask_size, "little")
+
+        return write
+
+    def _field_writer(self, spec: FieldSpec) -> Callable:
+        write_model = self._write_model
+
+        if spec.kind is FieldKind.MODEL:
+            return write_model
+
+        if spec.kind is FieldKind.MODEL_CONTAINER:
+            def write_models(out, value, tags):
+                _write_varint(out, len(value))
+                for v in value:
+                    write_model(out, v, tags)
+            return write_models
+
+        if spec.kind is FieldKind.CONTAINER:
+            write_scalar, _ = _scalar_codec(spec.field_type.data_type)
+            def write_scalars(out, value, tags):
+                _write_varint(out, len(value))
+                for v in value:
+                    write_scalar(out, v)
+            return write_scalars
+
+        scalar_type = spec.field_type.attr_type \
+            if spec.kind is FieldKind.ATTR else spec.field_type
+        write_scalar, _ = _scalar_codec(scalar_type)
+        return write_scalar
+
+    def _build_reader(self, cls: type) -> Callable:
+        # slots are set directly, fields come from specs and need no
+        # __init__ argument checks
+        fields = [
+            (getattr(cls, spec.name).__set__, self._field_reader(spec))
+            for spec in cls._field_specs.values()
+        ]
+        new = cls.__new__
+        mask_size = _mask_size(cls)
+
+        def read(reader: _Reader, classes: list[type]) -> Any:
+            start = reader.pos
+            reader.pos = start + mask_size
+            mask = int.from_bytes(reader.data[start:reader.pos], "little")
+            obj = new(cls)
+            for set_value, read_field in fields:
+                if mask & 1:
+                    set_value(obj, read_field(reader, classes))
+                elif not mask:
+                    break
+                mask >>= 1
+            return obj
+
+        return read
+
+    def _field_reader(self, spec: FieldSpec) -> Callable:
+        read_model = self._read_model
+
+        if spec.kind is FieldKind.MODEL:
+            field_type = spec.field_type
+            return lambda reader, classes: \
+                read_model(reader, field_type, classes)
+
+        if spec.kind is FieldKind.MODEL_CONTAINER:
+            container_type = spec.field_type.container_type
+            data_type = spec.field_type.data_type
+            return lambda reader, classes: container_type([
+                read_model(reader, data_type, classes)
+                for _ in range(reader.read_varint())
+            ])
+
+        if spec.kind is FieldKind.CONTAINER:
+            container_type = spec.field_type.container_type
+            _, read_scalar = _scalar_codec(spec.field_type.data_type)
+            return lambda reader, classes: container_type([
+                read_scalar(reader) for _ in range(reader.read_varint())
+            ])
+
+        scalar_type = spec.field_type.attr_type \
+            if spec.kind is FieldKind.ATTR else spec.field_type
+        _, read_scalar = _scalar_codec(scalar_type)
+        return read_scalar
+
+
+default_binary_codec = BinaryCodec()
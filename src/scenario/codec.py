@@ -0,0 +1,306 @@
+"""
+Fast XML codec of the models.
+
+Decoders and encoders are generated once per model class from the field
+specs resolved by `InitMeta`. Parsing is done by lxml when it is available,
+the encoder writes the same markup as `xml.etree.ElementTree` does for
+`XMLModel._to_xml_element`, byte for byte, except for carriage returns in
+text, which are escaped to survive parsing.
+"""
+
+from enum import Enum
+from typing import Any, Callable, NamedTuple
+
+try:
+    from lxml import etree as _etree
+    _PARSER = _etree.XMLParser(
+        encoding="utf-8",
+        remove_comments=True,
+        remove_pis=True,
+        huge_tree=True,
+        no_network=True,
+    )
+
+    def _parse(data: str | bytes):
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return _etree.fromstring(data, _PARSER)
+
+except ImportError:
+    import xml.etree.ElementTree as _etree
+
+    def _parse(data: str | bytes):
+        return _etree.fromstring(data)
+
+
+class InvalidXmlData(Exception):
+    """ Markup doesn't describe the model, line is counted from the start of
+    the decoded data, None if the parser doesn't track lines.
+    """
+
+    def __init__(self, reason: str, line: int | None = None):
+        position = f" at line {line}" if line is not None else ""
+        super().__init__(f"{reason}{position}")
+        self.reason = reason
+        self.line = line
+
+    def shifted(self, lines: int) -> "InvalidXmlData":
+        """ Same error in data, which starts `lines` lines later """
+        if self.line is None:
+            return self
+        return type(self)(self.reason, self.line + lines)
+
+
+class InvalidFieldValue(InvalidXmlData):
+    pass
+
+
+def get_line(element) -> int | None:
+    # lxml elements know their line, ElementTree ones don't
+    return getattr(element, 'sourceline', None)
+
+
+class FieldKind(Enum):
+    ATTR            = "attr"
+    VALUE           = "value"
+    ENUM            = "enum"
+    MODEL           = "model"
+    CONTAINER       = "container"
+    MODEL_CONTAINER = "model_container"
+
+
+class FieldSpec(NamedTuple):
+    name: str
+    kind: FieldKind
+    field_type: Any   # type, XmlAttr or Container depending on kind
+
+
+def _escape_cdata(text: str) -> str:
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if "\r" in text:
+        # parsers turn a literal one into "\n"
+        text = text.replace("\r", "&#13;")
+    return text
+
+
+def _escape_attrib(text: str) -> str:
+    text = _escape_cdata(text)
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _text_element(tag: str, text: str) -> str:
+    if text:
+        return f"<{tag}>{_escape_cdata(text)}</{tag}>"
+    return f"<{tag} />"
+
+
+def _str_from_text(text: str | None) -> str:
+    # empty string is written as an empty element, which has no text
+    return "" if text is None else text
+
+
+def get_text_decoder(data_type: type) -> Callable[[str | None], Any]:
+    """ Converts element text to data_type """
+    return _str_from_text if data_type is str else data_type
+
+
+_Decoder = Callable[[Any], Any]
+_Encoder = Callable[[Any, list[str]], None]
+
+
+class XMLCodec:
+    def __init__(self):
+        self._decoders = dict[type, _Decoder]()
+        self._encoders = dict[type, _Encoder]()
+
+    def decode(self, cls: type, data: str | bytes) -> Any:
+        """
+        Raises:
+            UnknownTag: no model is registered for a tag.
+            InvalidFieldValue: a value can't be converted to its field type.
+        """
+        return self.decode_element(cls, _parse(data))
+
+    def encode(self, obj: Any) -> str:
+        out = list[str]()
+        self._get_encoder(type(obj))(obj, out)
+        return "".join(out)
+
+    def decode_element(self, cls: type, element) -> Any:
+        if element.tag != cls._xml_tag:
+            cls = cls._resolve_xml_class(element)
+        decoder = self._decoders.get(cls)
+        if decoder is None:
+            decoder = self._decoders[cls] = self._build_decoder(cls)
+        return decoder(element)
+
+    def _get_encoder(self, cls: type) -> _Encoder:
+        encoder = self._encoders.get(cls)
+        if encoder is None:
+            encoder = self._encoders[cls] = self._build_encoder(cls)
+        return encoder
+
+    def _build_decoder(self, cls: type) -> _Decoder:
+        attrs = list[tuple[str, str, type]]()
+        children = dict[str, _Decoder]()
+
+        for spec in cls._field_specs.values():
+            if spec.kind is FieldKind.ATTR:
+                attrs.append((
+                    spec.name,
+                    spec.field_type.name,
+                    spec.field_type.attr_type,
+                ))
+            else:
+                children[spec.name] = self._build_field_decoder(spec)
+
+        def decode(element) -> Any:
+            try:
+                fields = {
+                    name: attr_type(element.get(attr_name))
+                    for name, attr_name, attr_type in attrs
+                }
+            except (TypeError, ValueError) as e:
+                raise InvalidFieldValue(
+                    f"Invalid attribute of <{element.tag}>: {e}",
+                    get_line(element),
+                ) from e
+            for child in element:
+                decoder = children.get(child.tag)
+                if decoder is not None:
+                    # errors of nested models are raised with their own line
+                    try:
+                        fields[child.tag] = decoder(child)
+                    except (IndexError, TypeError, ValueError) as e:
+                        raise InvalidFieldValue(
+                            f"Invalid <{child.tag}>: {e}", get_line(child),
+                        ) from e
+            return cls(**fields)
+
+        return decode
+
+    def _build_field_decoder(self, spec: FieldSpec) -> _Decoder:
+        field_type = spec.field_type
+        decode_element = self.decode_element
+
+        if spec.kind is FieldKind.MODEL:
+            return lambda el: decode_element(field_type, el[0])
+
+        if spec.kind is FieldKind.MODEL_CONTAINER:
+            container_type = field_type.container_type
+            data_type = field_type.data_type
+            return lambda el: container_type(
+                [decode_element(data_type, child) for child in el]
+            )
+
+        if spec.kind is FieldKind.CONTAINER:
+            container_type = field_type.container_type
+            data_type = get_text_decoder(field_type.data_type)
+            return lambda el: container_type(
+                [data_type(child.text) for child in el]
+            )
+
+        field_type = get_text_decoder(field_type)
+        return lambda el: field_type(el.text)
+
+    def _build_encoder(self, cls: type) -> _Encoder:
+        tag = cls._xml_tag
+        # slot descriptors raise AttributeError for unset fields
+        fields = [
+            (getattr(cls, spec.name).__get__, self._build_field_encoder(spec))
+            for spec in cls._field_specs.values()
+        ]
+        # models backed by not yet decoded markup write it as is
+        get_fragment = getattr(cls, '_get_xml_fragment', None)
+
+        def encode(obj: Any, out: list[str]) -> None:
+            if get_fragment is not None:
+                fragment = get_fragment(obj)
+                if fragment is not None:
+                    out.append(fragment)
+                    return
+
+            attrs = list[str]()
+            start = len(out)
+            out.append("")   # start tag, known once attributes are collected
+
+            for get_value, encode_field in fields:
+                try:
+                    value = get_value(obj)
+                except AttributeError:
+                    continue
+                if not callable(value):
+                    encode_field(value, attrs, out)
+
+            if len(out) > start + 1:
+                out[start] = f"<{tag}{''.join(attrs)}>"
+                out.append(f"</{tag}>")
+            else:
+                out[start] = f"<{tag}{''.join(attrs)} />"
+
+        return encode
+
+    def _build_field_encoder(self, spec: FieldSpec) -> Callable:
+        name = spec.name
+        field_type = spec.field_type
+        get_encoder = self._get_encoder
+
+        if spec.kind is FieldKind.ATTR:
+            attr_type = field_type.attr_type
+            def encode_attr(value, attrs, out):
+                attrs.append(
+                    f" {name}=\"{_escape_attrib(str(attr_type(value)))}\""
+                )
+            return encode_attr
+
+        if spec.kind is FieldKind.ENUM:
+            def encode_enum(value, attrs, out):
+                out.append(_text_element(name, str(value.value)))
+            return encode_enum
+
+        if spec.kind is FieldKind.MODEL:
+            def encode_model(value, attrs, out):
+                out.append(f"<{name}>")
+                get_encoder(type(value))(value, out)
+                out.append(f"</{name}>")
+            return encode_model
+
+        if spec.kind is FieldKind.MODEL_CONTAINER:
+            def encode_models(value, attrs, out):
+                if not value:
+                    out.append(f"<{name} />")
+                    return
+                out.append(f"<{name}>")
+                for v in value:
+                    get_encoder(type(v))(v, out)
+                out.append(f"</{name}>")
+            return encode_models
+
+        if spec.kind is FieldKind.CONTAINER:
+            def encode_values(value, attrs, out):
+                if not value:
+                    out.append(f"<{name} />")
+                    return
+                out.append(f"<{name}>")
+                for v in value:
+                    out.append(_text_element("el", str(v)))
+                out.append(f"</{name}>")
+            return encode_values
+
+        def encode_value(value, attrs, out):
+            out.append(_text_element(name, str(field_type(value))))
+        return encode_value
+
+
+default_codec = XMLCodec()
@@ -0,0 +1,71 @@
+"""
+Converts projects between XML and the binary format.
+
+    python -m scenario.convert project.xml project.rfpb
+    python -m scenario.convert project.rfpb project.xml
+"""
+
+from scenario.models import Project
+from scenario.binary import (
+    InvalidBinaryData, default_binary_codec, is_binary_file,
+)
+import argparse
+import sys
+
+
+XML = "xml"
+BINARY = "binary"
+
+
+def convert(input_path: str, output_path: str, to: str | None = None) -> str:
+    """ Writes project from input_path to output_path in the other format.
+
+    Args:
+        to: target format, opposite to the input one by default.
+
+    Returns:
+        Format the project was written in.
+    """
+    with open(input_path, 'rb') as file:
+        data = file.read()
+
+    if is_binary_file(input_path):
+        project = default_binary_codec.loads(Project, data)
+        to = to or XML
+    else:
+        project = Project.from_xml(data)
+        to = to or BINARY
+
+    if to == BINARY:
+        with open(output_path, 'wb') as file:
+            file.write(default_binary_codec.dumps(project))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as file:
+            file.write(project.to_xml())
+    return to
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="project-convert",
+        description="Convert project between XML and binary formats",
+    )
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument(
+        "--to", choices=(XML, BINARY),
+        help="target format, opposite to the input one by default",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        to = convert(args.input, args.output, args.to)
+    except (OSError, SyntaxError, InvalidBinaryData) as e:
+        print(f"project-convert: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.input} -> {args.output} ({to})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+"""
+Streaming project loader.
+
+The file is scanned once to index scenario names and byte spans, scenarios
+themselves are decoded only on first access to any of their other fields.
+Scenaries are read back by their offsets, so the file must not change while
+the project is open, which is checked by the file's mtime and size.
+"""
+
+from scenario.models import Project, Scenario
+from scenario.codec import FieldKind, InvalidXmlData, default_codec
+import xml.etree.ElementTree as ET
+from contextlib import ExitStack
+from threading import Lock
+from typing import NamedTuple
+import mmap
+import os
+import re
+
+
+# in well-formed XML "<" always starts markup, so only comments, CDATA and
+# processing instructions have to be skipped to find the tags reliably
+_SKIPPED = rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>"
+_ROOT_TAG = re.compile(
+    _SKIPPED + rb"|<!DOCTYPE[^>]*>|(?P<tag><[^>]*>)", re.S
+)
+_SCENARIO_TAG = re.compile(
+    _SKIPPED + rb"|<(?P<close>/?)Scenario(?=[\s/>])[^>]*?(?P<empty>/?)>",
+    re.S,
+)
+_NAME_ELEMENT = re.compile(rb"<name\s*/>|<name\s*>.*?</name\s*>", re.S)
+_STATES_START = re.compile(rb"<states[\s/>]")
+_STATES_END = re.compile(rb"<states\s*/>|</states\s*>")
+
+
+class InvalidProjectFile(Exception):
+    pass
+
+
+class ProjectFileChanged(InvalidProjectFile):
+    pass
+
+
+class FileSignature(NamedTuple):
+    mtime_ns: int
+    size: int
+
+    @staticmethod
+    def of(stat: os.stat_result) -> "FileSignature":
+        return FileSignature(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+
+
+class ScenarioIndexEntry(NamedTuple):
+    name: str | None
+    start: int   # byte offset of "<Scenario"
+    end: int     # byte offset right after "</Scenario>"
+
+
+class ProjectIndex(NamedTuple):
+    attributes: dict[str, str]
+    scenaries: list[ScenarioIndexEntry]
+    signature: FileSignature   # of the file when it was indexed
+
+
+class ProjectSource:
+    """ File the lazy scenarios are read from """
+
+    def __init__(self, file_path: str | os.PathLike, signature: FileSignature):
+        self.file_path = file_path
+        self.signature = signature
+        self.lock = Lock()
+
+    def check(self, stat: os.stat_result) -> None:
+        """
+        Raises:
+            ProjectFileChanged: the file is not the indexed one anymore.
+        """
+        if FileSignature.of(stat) != self.signature:
+            raise ProjectFileChanged(
+                f"{self.file_path}: changed on disk since it was opened"
+            )
+
+    def read_fragment(self, start: int, end: int) -> bytes:
+        with open(self.file_path, 'rb') as file:
+            self.check(os.fstat(file.fileno()))
+            file.seek(start)
+            return file.read(end - start)
+
+    def decode_scenario(self, entry: ScenarioIndexEntry) -> Scenario:
+        """
+        Raises:
+            InvalidProjectFile: the scenario's markup is invalid, its line is
+                                counted from the start of the file.
+        """
+        fragment = self.read_fragment(entry.start, entry.end)
+        try:
+            return default_codec.decode(Scenario, fragment)
+        except InvalidXmlData as e:
+            # lines of the fragment are counted from its start
+            error = e.shifted(self._count_lines(entry.start))
+            raise InvalidProjectFile(f"{self.file_path}: {error}") from e
+
+    def _count_lines(self, end: int) -> int:
+        with open(self.file_path, 'rb') as file:
+            self.check(os.fstat(file.fileno()))
+            return file.read(end).count(b"\n")
+
+
+class LazyScenario(Scenario):
+    """ Scenario, which fields except `name` are decoded on first access """
+
+    __slots__ = ("_source", "_entry")
+    _xml_tag = "Scenario"
+
+    def __init__(self, name: str, source: ProjectSource, entry: ScenarioIndexEntry):
+        self._source = source
+        self._entry = entry
+        super().__setattr__("name", name)
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._source is None
+
+    def __getattr__(self, name: str):
+        # called only for fields which are not set yet
+        if name.startswith('_') or self._source is None:
+            raise AttributeError(name)
+        self._materialize()
+        return getattr(self, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        # edited scenario can't be saved from its source markup anymore
+        if not name.startswith('_'):
+            self._materialize()
+        super().__setattr__(name, value)
+
+    def _materialize(self) -> None:
+        while True:
+            source = self._source
+            if source is None:   # materialized, maybe by another thread
+                return
+            with source.lock:
+                # the source is replaced, when the file is saved meanwhile
+                if self._source is not source:
+                    continue
+                scenario = source.decode_scenario(self._entry)
+                for name, value in scenario._iter_set_fields():
+                    super().__setattr__(name, value)
+                self._source = None
+                return
+
+    def get_markup_span(
+        self,
+    ) -> tuple[ProjectSource, ScenarioIndexEntry] | None:
+        """ Where the markup is read from while the scenario is not
+        materialized, the file itself is not read.
+        """
+        while True:
+            source = self._source
+            if source is None:
+                return None
+            with source.lock:
+                if self._source is source:
+                    return source, self._entry
+
+    def _get_xml_fragment(self) -> str | None:
+        """ Source markup while the scenario is not materialized """
+        while True:
+            source = self._source
+            if source is None:
+                return None
+            # the source is replaced, when the file is saved meanwhile
+            with source.lock:
+                if self._source is source:
+                    return source.read_fragment(
+                        self._entry.start, self._entry.end
+                    ).decode('utf-8')
+
+
+def _read_name(data, start: int, end: int) -> str | None:
+    """ Text of the scenario's own <name>, which is not inside <states> """
+
+    name = _NAME_ELEMENT.search(data, start, end)
+    if name is not None and \
+            _STATES_START.search(data, start, name.start()) is not None:
+        states_end = None
+        for states_end in _STATES_END.finditer(data, start, end):
+            pass
+        name = _NAME_ELEMENT.search(data, states_end.end(), end)
+    if name is None:
+        return None
+    return ET.fromstring(name.group()).text
+
+
+def index_project(file_path: str | os.PathLike) -> ProjectIndex:
+    """ Scans the file and collects scenario names and byte spans.
+
+    Raises:
+        InvalidProjectFile: the file is not a project.
+    """
+    scenaries = list[ScenarioIndexEntry]()
+
+    with open(file_path, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # taken first, so a change during the scan is noticed on reading
+        signature = FileSignature.of(os.fstat(file.fileno()))
+        root = None
+        for match in _ROOT_TAG.finditer(data):
+            if match.group("tag") is not None:
+                root = match
+                break
+        if root is None or not re.match(rb"<Project[\s/>]", root.group()):
+            raise InvalidProjectFile(f"{file_path}: root is not <Project>")
+
+        root_tag = root.group().decode('utf-8')
+        if not root_tag.endswith("/>"):
+            root_tag = root_tag[:-1] + "/>"
+        attributes = ET.fromstring(root_tag).attrib
+
+        start = None
+        for match in _SCENARIO_TAG.finditer(data, root.end()):
+            if match.group("close") is None:
+                continue   # skipped markup
+            if match.group("close"):
+                if start is None:
+                    raise InvalidProjectFile(
+                        f"{file_path}: unexpected </Scenario> "
+                        f"at byte {match.start()}"
+                    )
+                end = match.end()
+            elif match.group("empty"):
+                start, end = match.start(), match.end()
+            else:
+                start = match.start()
+                continue
+
+            scenaries.append(ScenarioIndexEntry(
+                name=_read_name(data, start, end),
+                start=start,
+                end=end,
+            ))
+            start = None
+
+    return ProjectIndex(
+        attributes=attributes, scenaries=scenaries, signature=signature,
+    )
+
+
+def load_project(file_path: str | os.PathLike) -> Project:
+    """ Opens project with lazily materialized scenaries """
+
+    index = index_project(file_path)
+    return build_lazy_project(index, ProjectSource(file_path, index.signature))
+
+
+def build_lazy_project(index: ProjectIndex, source: ProjectSource) -> Project:
+    """ Project of the indexed file, which scenaries are read from source """
+
+    name_type = Scenario._field_specs["name"].field_type
+
+    fields = {
+        spec.name: spec.field_type.attr_type(
+            index.attributes.get(spec.field_type.name)
+        )
+        for spec in Project._field_specs.values()
+        if spec.kind is FieldKind.ATTR
+    }
+    fields["scenaries"] = [
+        LazyScenario(name=name_type(entry.name), source=source, entry=entry)
+        for entry in index.scenaries
+    ]
+    return Project(**fields)
+
+
+def rebind_project(project: Project, file_path: str | os.PathLike) -> None:
+    """ Points not materialized scenaries to the freshly saved file """
+
+    index = index_project(file_path)
+    source = ProjectSource(file_path, index.signature)
+    for scenario, entry in zip(project.scenaries, index.scenaries):
+        if isinstance(scenario, LazyScenario) and not scenario.is_materialized:
+            scenario._source = source
+            scenario._entry = entry
+
+
+def replace_project_file(
+    project: Project,
+    temp_path: str | os.PathLike,
+    file_path: str | os.PathLike,
+) -> None:
+    """ Moves temp_path over file_path and rebinds project's scenaries to it.
+
+    Lazy scenaries can't be materialized in between, as their offsets point
+    to the replaced file until they are rebound.
+    """
+    sources = {
+        id(s._source): s._source for s in project.scenaries
+        if isinstance(s, LazyScenario) and not s.is_materialized
+    }
+    with ExitStack() as stack:
+        for source in sources.values():
+            stack.enter_context(source.lock)
+        os.replace(temp_path, file_path)
+        rebind_project(project, file_path)
@@ -91,5 +91,5 @@ class Scenario(Model):
 
 
 class Project(Model):
-    version: XmlAttr("ver", str)
+    version: XmlAttr("version", str)
     scenaries: Container(list, Scenario)
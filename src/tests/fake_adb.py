@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the adb executable, for running shell sessions without devices.
+
+Link it as `adb` into a directory put first on PATH. Supported commands are
+`devices`, `shell` reading commands from stdin and `shell COMMAND...`.
+Shell commands run in the local sh, where `input`, `monkey` and `am` only
+append their arguments to the FAKE_ADB_LOG file, one line per call:
+
+    <serial> <session|oneshot> <command> <arguments>
+
+Environment:
+    FAKE_ADB_DEVICES: comma separated serials, "emulator-5554" by default.
+    FAKE_ADB_LOG: log file of the device commands, not written if unset.
+    FAKE_ADB_SESSION_LIMIT: shell session exits after reading that many
+                            lines from stdin, emulating a lost connection.
+"""
+
+import os
+import subprocess
+import sys
+
+
+_COMMANDS = ("input", "monkey", "am")
+
+
+def _get_prelude(serial: str, mode: str) -> str:
+    """ Shell functions logging the device commands """
+    log = os.environ.get("FAKE_ADB_LOG", os.devnull)
+    return "".join(
+        f'{name}() {{ printf "%s\\n" "{serial} {mode} {name} $*" >> "{log}"; }}\n'
+        for name in _COMMANDS
+    )
+
+
+def _run_session(serial: str) -> int:
+    limit = int(os.environ.get("FAKE_ADB_SESSION_LIMIT", "0")) or None
+    shell = subprocess.Popen(["sh"], stdin=subprocess.PIPE, bufsize=0)
+    shell.stdin.write(_get_prelude(serial, "session").encode())
+
+    lines_count = 0
+    stdin = sys.stdin.buffer
+    while line := stdin.readline():
+        if limit is not None and lines_count >= limit:
+            shell.kill()
+            return 255
+        lines_count += 1
+        try:
+            shell.stdin.write(line)
+        except BrokenPipeError:
+            break
+    shell.stdin.close()
+    return shell.wait()
+
+
+def main(argv: list[str]) -> int:
+    serials = os.environ.get("FAKE_ADB_DEVICES", "emulator-5554").split(",")
+    serial = serials[0]
+
+    while argv and argv[0] in ("-s", "-H", "-P"):
+        if argv[0] == "-s":
+            serial = argv[1]
+        argv = argv[2:]
+
+    if argv == ["devices"]:
+        print("List of devices attached")
+        for name in serials:
+            print(f"{name}\tdevice")
+        return 0
+
+    if not argv or argv[0] != "shell":
+        print(f"fake adb: unsupported command {argv}", file=sys.stderr)
+        return 1
+    if serial not in serials:
+        print(f"error: device '{serial}' not found", file=sys.stderr)
+        return 1
+
+    if len(argv) == 1:
+        return _run_session(serial)
+    # like adb, arguments are joined and parsed again by the device shell
+    return subprocess.call([
+        "sh", "-c", _get_prelude(serial, "oneshot") + " ".join(argv[1:])
+    ])
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,80 @@
+from time import sleep
+
+
+class _FakeProcess:
+    returncode = 0
+
+    def communicate(self, timeout: float | None = None) -> tuple[bytes, bytes]:
+        return b"", b""
+
+
+class _FakeAdb:
+    def __init__(self, device: "FakeDevice"):
+        self._device = device
+
+    def adb(self) -> str:
+        # no shell sessions, every command goes through cmd
+        raise EnvironmentError("fake device has no adb")
+
+    def cmd(self, *args) -> _FakeProcess:
+        return self.raw_cmd(*args)
+
+    def raw_cmd(self, *args) -> _FakeProcess:
+        self._device._record("adb", " ".join(args))
+        return _FakeProcess()
+
+
+class _FakeServer:
+    def __init__(self, device: "FakeDevice"):
+        self.adb = _FakeAdb(device)
+
+
+class _FakeSelector:
+    def __init__(self, device: "FakeDevice", selector: dict):
+        self._device = device
+        self._selector = selector
+
+    def click(self) -> bool:
+        self._device._record("click_selector", self._selector)
+        return True
+
+
+class FakeDevice:
+    """ Stand-in for `uiautomator.Device` driven by a list of UI dumps.
+
+    Every action run on the device switches it to the next screen, the last
+    screen stays forever. Performed actions are kept in `actions`.
+    """
+
+    def __init__(
+        self,
+        serial: str = "fake",
+        screens: list[str] | None = None,
+        dump_delay: float = 0,
+    ):
+        self.serial = serial
+        self.actions = list[tuple]()
+        self.dumps_count = 0
+        self.server = _FakeServer(self)
+
+        self._screens = screens or ["<hierarchy rotation=\"0\"/>"]
+        self._screen_index = 0
+        self._dump_delay = dump_delay
+
+    def _record(self, *action) -> None:
+        self.actions.append(action)
+        self._screen_index = min(
+            self._screen_index + 1, len(self._screens) - 1
+        )
+
+    def dump(self) -> str:
+        sleep(self._dump_delay)
+        self.dumps_count += 1
+        return self._screens[self._screen_index]
+
+    def click(self, x: float, y: float) -> bool:
+        self._record("click", x, y)
+        return True
+
+    def __call__(self, **selector) -> _FakeSelector:
+        return _FakeSelector(self, selector)
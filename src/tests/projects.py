@@ -0,0 +1,21 @@
+from scenario.models import Project, Scenario, State
+
+
+def make_project(*names: str, states_count: int = 1, **state_fields) -> Project:
+    """ Scenaries with the names, their states are named
+    "<scenario name> state <state_id>" and get state_fields.
+    """
+    scenaries = list[Scenario]()
+    for name in names:
+        states = list[State]()
+        for state_id in range(states_count):
+            state = State.get_blank_instance()
+            state.name = f"{name} state {state_id}"
+            state.state_id = state_id
+            for field, value in state_fields.items():
+                setattr(state, field, value)
+            states.append(state)
+        scenaries.append(
+            Scenario(name=name, initial_state_id=0, states=states)
+        )
+    return Project(version="v0.1", scenaries=scenaries)
@@ -0,0 +1,91 @@
+from scenario.models import (
+    ClickCoordsAction, ClickTextAction, Point, RunAppAction, WaitAction,
+    WriteAction,
+)
+from roboflow.actions import (
+    MAX_BATCH_WAIT_MS, SHORT_WAIT_MS, HostAction, ShellBatch, compile_actions,
+)
+from roboflow.adb_shell import input_text_command, run_app_command
+
+
+def click(x: float, y: float, duration_ms: int = 0) -> ClickCoordsAction:
+    return ClickCoordsAction(coords=Point(x=x, y=y), duration_ms=duration_ms)
+
+
+def wait(duration_ms: int) -> WaitAction:
+    return WaitAction(duration_ms=duration_ms)
+
+
+def test_mixed_actions():
+    click_text = ClickTextAction(text="OK", duration_ms=0)
+
+    steps = compile_actions([
+        RunAppAction(package_name="com.example"),
+        click(10.4, 20.6),
+        WriteAction(text="hello world"),
+        click_text,
+        wait(100),
+        click(1, 2, duration_ms=800),
+    ])
+
+    assert steps == (
+        ShellBatch((
+            run_app_command("com.example"),
+            "input tap 10 21",
+            input_text_command("hello world"),
+        )),
+        HostAction(click_text),
+        ShellBatch(("sleep 0.1", "input swipe 1 2 1 2 800")),
+    )
+
+
+def test_batch_is_split_by_host_actions():
+    long_wait = wait(SHORT_WAIT_MS + 1)
+
+    steps = compile_actions([click(1, 1), long_wait, click(2, 2)])
+
+    assert steps == (
+        ShellBatch(("input tap 1 1",)),
+        HostAction(long_wait),
+        ShellBatch(("input tap 2 2",)),
+    )
+
+
+def test_zero_length_waits_are_dropped():
+    assert compile_actions([wait(0), click(1, 1), wait(0)]) == \
+        (ShellBatch(("input tap 1 1",)),)
+    assert compile_actions([wait(0)]) == ()
+
+
+def test_short_waits_are_run_on_the_device():
+    steps = compile_actions([wait(SHORT_WAIT_MS), click(1, 1)])
+
+    assert steps == (ShellBatch(("sleep 0.5", "input tap 1 1")),)
+
+
+def test_device_waits_of_a_batch_are_bounded():
+    waits = [wait(SHORT_WAIT_MS)] * 3
+
+    steps = compile_actions(waits)
+
+    # the third one would make the batch wait longer than the limit
+    assert 2 * SHORT_WAIT_MS <= MAX_BATCH_WAIT_MS < 3 * SHORT_WAIT_MS
+    assert steps == (
+        ShellBatch(("sleep 0.5", "sleep 0.5")),
+        HostAction(waits[2]),
+    )
+
+
+def test_limit_is_counted_again_after_a_host_action():
+    click_text = ClickTextAction(text="OK", duration_ms=0)
+
+    steps = compile_actions([
+        wait(SHORT_WAIT_MS), wait(SHORT_WAIT_MS), click_text,
+        wait(SHORT_WAIT_MS), wait(SHORT_WAIT_MS),
+    ])
+
+    assert steps == (
+        ShellBatch(("sleep 0.5", "sleep 0.5")),
+        HostAction(click_text),
+        ShellBatch(("sleep 0.5", "sleep 0.5")),
+    )
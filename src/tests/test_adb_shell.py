@@ -0,0 +1,134 @@
+from roboflow.adb_shell import (
+    AdbShellSession, AdbShellTransport, CommandResult, input_text_command,
+)
+from uiautomator import Adb
+import os
+import pytest
+import sys
+
+
+pytestmark = pytest.mark.skipif(
+    os.name == "nt", reason="fake adb runs commands in sh"
+)
+
+FAKE_ADB = os.path.join(os.path.dirname(__file__), "fake_adb.py")
+SERIAL = "emulator-5554"
+
+
+@pytest.fixture
+def device_log(tmp_path, monkeypatch):
+    """ Lines the device commands have logged, see fake_adb """
+
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "adb").symlink_to(FAKE_ADB)
+    log_path = tmp_path / "device.log"
+    log_path.touch()
+
+    monkeypatch.delenv("ANDROID_HOME", raising=False)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_ADB_DEVICES", SERIAL)
+    monkeypatch.setenv("FAKE_ADB_LOG", str(log_path))
+    return lambda: log_path.read_text().splitlines()
+
+
+@pytest.fixture
+def session(device_log):
+    session = AdbShellSession(
+        [sys.executable, FAKE_ADB, "-s", SERIAL, "shell"], timeout=5,
+    )
+    yield session
+    session.close()
+
+
+def test_batch_is_written_at_once(session, device_log, monkeypatch):
+    writes = list[bytes]()
+    write = session._write
+    monkeypatch.setattr(
+        session, "_write", lambda data: (writes.append(data), write(data))
+    )
+
+    results = session.run_batch(
+        [input_text_command(f"text{i}") for i in range(20)]
+    )
+
+    assert len(writes) == 1
+    assert results == [CommandResult(status=0, output="")] * 20
+    assert device_log() == [
+        f"{SERIAL} session input text text{i}" for i in range(20)
+    ]
+
+
+def test_exit_status_and_output_of_every_command(session):
+    results = session.run_batch([
+        "echo out; false",
+        "printf 'no newline'",
+        "echo err >&2; (exit 3)",
+        "echo __roboflow_0123456789abcdef__ 0",
+        "true",
+    ])
+
+    assert results == [
+        CommandResult(status=1, output="out\n"),
+        CommandResult(status=0, output="no newline"),
+        CommandResult(status=3, output="err\n"),
+        CommandResult(status=0, output="__roboflow_0123456789abcdef__ 0\n"),
+        CommandResult(status=0, output=""),
+    ]
+    assert session.run("echo again") == CommandResult(0, "again\n")
+
+
+TEXTS = [
+    "hello world; rm -rf /",
+    "it's \"quoted\" $HOME `id` \\n *",
+]
+
+
+@pytest.mark.parametrize("max_sessions", [1, 0], ids=["session", "oneshot"])
+def test_input_text_is_passed_as_is(device_log, max_sessions):
+    transport = AdbShellTransport(
+        Adb(serial=SERIAL), timeout=5, max_sessions=max_sessions,
+    )
+    try:
+        transport.run_batch([input_text_command(text) for text in TEXTS])
+    finally:
+        transport.close()
+
+    mode = "session" if max_sessions else "oneshot"
+    assert device_log() == [
+        f"{SERIAL} {mode} input text {text.replace(' ', '%s')}"
+        for text in TEXTS
+    ]
+
+
+def test_commands_run_as_processes_after_session_died(
+    device_log, monkeypatch, caplog,
+):
+    # the session reads "exec 2>&1" and 2 lines per command, then dies
+    monkeypatch.setenv("FAKE_ADB_SESSION_LIMIT", "5")
+    transport = AdbShellTransport(Adb(serial=SERIAL), timeout=5, max_sessions=1)
+    commands = [input_text_command(f"text{i}") for i in range(6)]
+
+    try:
+        outputs = transport.run_batch(commands)
+        transport.run(input_text_command("later"))
+    finally:
+        transport.close()
+
+    assert outputs == [""] * 6
+    assert "Shell session died" in caplog.text
+
+    expected = [f"text{i}" for i in range(6)]
+    session_texts = list[str]()
+    process_texts = list[str]()
+    for line in device_log():
+        _, mode, _, _, text = line.split()
+        (session_texts if mode == "session" else process_texts).append(text)
+
+    # commands the session answered are not run again, the one it died on
+    # may have run in it already
+    answered = len(expected) - (len(process_texts) - 1)
+    assert 0 <= answered <= 2
+    assert process_texts == expected[answered:] + ["later"]
+    assert session_texts == expected[:len(session_texts)]
+    assert len(session_texts) >= answered
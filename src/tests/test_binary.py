@@ -0,0 +1,57 @@
+from scenario.models import Project, State
+from scenario.binary import MAGIC, InvalidBinaryData, default_binary_codec
+from benchmarks.fixtures import make_project
+from benchmarks.binary_benchmark import _as_data
+import pytest
+
+
+def test_round_trip_through_xml():
+    project = make_project(scenaries_count=3, states_count=20)
+
+    binary = default_binary_codec.dumps(project)
+    from_binary = default_binary_codec.loads(Project, binary)
+    from_xml = Project.from_xml(from_binary.to_xml())
+
+    assert _as_data(from_binary) == _as_data(project)
+    assert _as_data(from_xml) == _as_data(project)
+    assert default_binary_codec.dumps(from_xml) == binary
+
+
+def test_unset_fields_stay_unset():
+    state = State(name="partial", state_id=7)
+
+    loaded = default_binary_codec.loads(
+        State, default_binary_codec.dumps(state)
+    )
+
+    assert _as_data(loaded) == _as_data(state)
+    assert not hasattr(loaded, "actions")
+
+
+BINARY = default_binary_codec.dumps(make_project(1, 3))
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    b"<Project />",
+    MAGIC,
+    MAGIC + bytes([99]) + BINARY[len(MAGIC) + 1:],
+    BINARY[:-1],
+    BINARY[:len(BINARY) // 2],
+    BINARY + b"\x00",
+    # tag names are replaced, so no class is registered for them
+    BINARY.replace(b"State", b"Stati"),
+], ids=[
+    "empty", "xml", "magic only", "version", "last byte cut",
+    "half", "trailing byte", "unknown tag",
+])
+def test_corrupted_data_is_rejected(data):
+    with pytest.raises(InvalidBinaryData):
+        default_binary_codec.loads(Project, data)
+
+
+def test_other_model_is_rejected():
+    with pytest.raises(InvalidBinaryData):
+        default_binary_codec.loads(
+            State, default_binary_codec.dumps(make_project(1, 1))
+        )
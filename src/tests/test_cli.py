@@ -0,0 +1,62 @@
+from scenario.models import Project, Statement, ValueType, Condition
+from roboflow.cli import EXIT_CRASHED, EXIT_INVALID, main
+from tests import projects
+import json
+import pytest
+
+
+def make_project(xpath: str) -> Project:
+    return projects.make_project("test", statements={Statement(
+        value_type_1=ValueType.XPATH,
+        value1=xpath,
+        value_type_2=ValueType.CONST,
+        value2="OK",
+        condition=Condition.EQUAL,
+    )})
+
+
+def run(project_file, result_file) -> int:
+    return main([
+        "run", str(project_file), "--scenario", "test",
+        "--device", "emulator-5554", "--result", str(result_file),
+    ])
+
+
+@pytest.mark.parametrize("markup", [
+    make_project("//node[@text=").to_xml(),
+    make_project("//node/@text").to_xml()
+        .replace("<actions />", "<actions><SwipeAction /></actions>"),
+    make_project("//node/@text").to_xml()
+        .replace("<priority>100</priority>", "<priority>high</priority>"),
+], ids=["malformed xpath", "unknown action", "not a number"])
+def test_invalid_scenario_is_reported(tmp_path, capsys, markup):
+    project_file = tmp_path / "project.xml"
+    project_file.write_text(markup)
+    result_file = tmp_path / "result.json"
+
+    assert run(project_file, result_file) == EXIT_INVALID
+
+    result = json.loads(result_file.read_text())
+    assert result["success"] is False
+    assert result["exit_code"] == EXIT_INVALID
+    assert result["devices"] == []
+    assert result["error"]
+    assert result["error"] in capsys.readouterr().err
+
+
+def test_crash_is_reported(tmp_path, monkeypatch):
+    project_file = tmp_path / "project.xml"
+    project_file.write_text(make_project("//node/@text").to_xml())
+    result_file = tmp_path / "result.json"
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("roboflow.cli.run_on_devices", crash)
+
+    assert run(project_file, result_file) == EXIT_CRASHED
+
+    result = json.loads(result_file.read_text())
+    assert result["success"] is False
+    assert result["exit_code"] == EXIT_CRASHED
+    assert result["error"] == "RuntimeError: boom"
@@ -0,0 +1,93 @@
+from scenario.models import Project
+from scenario.codec import default_codec
+from scenario.base import UnknownTag
+from scenario.loader import (
+    InvalidProjectFile, ProjectFileChanged, load_project, rebind_project,
+)
+from tests.projects import make_project
+from lxml import etree
+from threading import Thread
+import os
+import pytest
+
+
+@pytest.fixture
+def project_file(tmp_path):
+    file_path = tmp_path / "project.xml"
+    file_path.write_text(make_project("first", "second").to_xml())
+    return file_path
+
+
+def test_scenaries_are_read_from_the_indexed_file(project_file):
+    project = load_project(project_file)
+
+    assert [s.name for s in project.scenaries] == ["first", "second"]
+    assert project.scenaries[1].states[0].name == "second state 0"
+
+
+def test_changed_file_is_not_read(project_file):
+    project = load_project(project_file)
+    project.scenaries[0].states   # materialized before the change
+
+    project_file.write_text(make_project("other", "second").to_xml())
+
+    assert project.scenaries[0].states[0].name == "first state 0"
+    with pytest.raises(ProjectFileChanged):
+        project.scenaries[1].states
+    with pytest.raises(ProjectFileChanged):
+        default_codec.encode(project)
+
+
+def test_file_of_the_same_size_is_not_read(project_file):
+    project = load_project(project_file)
+
+    stat = os.stat(project_file)
+    project_file.write_text(make_project("first", "secnod").to_xml())
+    os.utime(project_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert os.stat(project_file).st_size == stat.st_size
+
+    with pytest.raises(ProjectFileChanged):
+        project.scenaries[1].states
+
+
+
+def test_invalid_markup_is_reported_at_its_line_in_the_file(tmp_path):
+    markup = make_project("first", "second").to_xml()
+    # unknown action in the second scenario
+    head, tail = markup.rsplit("<actions />", 1)
+    markup = head + "<actions><SwipeAction /></actions>" + tail
+    file_path = tmp_path / "project.xml"
+    file_path.write_bytes(
+        etree.tostring(etree.fromstring(markup), pretty_print=True)
+    )
+    line = next(
+        i for i, text in enumerate(file_path.read_text().splitlines(), 1)
+        if "SwipeAction" in text
+    )
+
+    with pytest.raises(UnknownTag, match=f"at line {line}$"):
+        Project.from_xml(file_path.read_bytes())
+    project = load_project(file_path)
+    with pytest.raises(InvalidProjectFile, match=f"at line {line}$"):
+        project.scenaries[1].states
+
+
+def test_scenario_opened_while_the_file_is_replaced(project_file, tmp_path):
+    project = load_project(project_file)
+    scenario = project.scenaries[1]
+    old_source = scenario._source
+    saved_file = tmp_path / "saved.xml"
+    # the saved file has other offsets, the first scenario is renamed
+    saved_file.write_text(make_project("renamed first", "second").to_xml())
+
+    states = list()
+    # as replace_project_file does, which holds the lock while rebinding
+    with old_source.lock:
+        reader = Thread(target=lambda: states.extend(scenario.states))
+        reader.start()
+        reader.join(0.1)   # waits for the lock
+        os.replace(saved_file, project_file)
+        rebind_project(project, project_file)
+    reader.join(5)
+
+    assert [state.name for state in states] == ["second state 0"]
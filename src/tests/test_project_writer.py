@@ -0,0 +1,70 @@
+from scenario.models import Project, Scenario
+from scenario.binary import default_binary_codec
+from scenario.loader import load_project
+from editor.project_writer import ProjectWriter
+from tests.projects import make_project
+from threading import Event
+
+
+def test_edits_made_while_writing_are_not_saved(tmp_path):
+    file_path = tmp_path / "project.xml"
+    project = make_project("first", states_count=3)
+    writer = ProjectWriter()
+
+    # keeps the writer busy, so the save is only queued
+    release = Event()
+    writer._executor.submit(release.wait)
+    future = writer.save(project, file_path)
+
+    states = project.scenaries[0].states
+    states[0].name = "edited"
+    states[0].next_states.update({1, 2})
+    writer.invalidate(project.scenaries[0])
+    release.set()
+    future.result()
+
+    saved = load_project(file_path).scenaries[0].states
+    assert saved[0].name == "first state 0"
+    assert saved[0].next_states == set()
+
+    writer.save(project, file_path).result()
+    saved = load_project(file_path).scenaries[0].states
+    assert saved[0].name == "edited"
+    assert saved[0].next_states == {1, 2}
+
+
+def test_lazy_scenaries_are_saved_from_their_markup(tmp_path):
+    file_path = tmp_path / "project.xml"
+    file_path.write_text(make_project("first", states_count=3).to_xml())
+    project = load_project(file_path)
+    writer = ProjectWriter()
+
+    project.scenaries.append(
+        Scenario(name="second", initial_state_id=0, states=[])
+    )
+    writer.save(project, file_path).result()
+
+    assert not project.scenaries[0].is_materialized
+    assert [s.name for s in load_project(file_path).scenaries] == \
+        ["first", "second"]
+    # rebound to the saved file
+    assert project.scenaries[0].states[2].name == "first state 2"
+
+
+def test_binary_project_is_saved_from_the_snapshots(tmp_path):
+    file_path = tmp_path / "project.rfpb"
+    project = make_project("first", states_count=3)
+    writer = ProjectWriter()
+    writer.save(project, file_path, binary=True).result()
+
+    project.scenaries[0].states[1].name = "edited"
+    writer.invalidate(project.scenaries[0])
+    project.scenaries.append(
+        Scenario(name="second", initial_state_id=0, states=[])
+    )
+    writer.save(project, file_path, binary=True).result()
+
+    saved = default_binary_codec.loads(Project, file_path.read_bytes())
+    assert [s.name for s in saved.scenaries] == ["first", "second"]
+    assert [s.name for s in saved.scenaries[0].states] == \
+        ["first state 0", "edited", "first state 2"]
@@ -0,0 +1,123 @@
+from scenario.models import (
+    Scenario, State, Statement, ValueType, Condition, Point, ClickCoordsAction,
+)
+from roboflow.runner import run_on_devices
+from tests.fake_device import FakeDevice
+import logging
+
+
+LOADING = '<hierarchy><node text="Loading"/></hierarchy>'
+DONE = '<hierarchy><node text="Done"/></hierarchy>'
+
+
+def make_scenario() -> Scenario:
+    """ Clicks in the first state, passes once the screen says "Done" """
+
+    start = State.get_blank_instance()
+    start.name = "start"
+    start.state_id = 1
+    start.actions = [
+        ClickCoordsAction(coords=Point(x=10, y=20), duration_ms=0)
+    ]
+    start.next_states = {2}
+
+    done = State.get_blank_instance()
+    done.name = "done"
+    done.state_id = 2
+    done.statements = {Statement(
+        value_type_1=ValueType.XPATH,
+        value1="//node/@text",
+        value_type_2=ValueType.CONST,
+        value2="Done",
+        condition=Condition.EQUAL,
+    )}
+
+    return Scenario(name="test", initial_state_id=1, states=[start, done])
+
+
+def make_factory(screens: dict[str, list[str]], dump_delay: float = 0):
+    devices = dict[str, FakeDevice]()
+
+    def factory(serial: str) -> FakeDevice:
+        if serial not in screens:
+            raise ConnectionError(f"{serial} is offline")
+        devices[serial] = FakeDevice(serial, screens[serial], dump_delay)
+        return devices[serial]
+
+    return factory, devices
+
+
+def test_summary_of_passed_failed_and_crashed_devices():
+    factory, devices = make_factory({
+        "passing": [LOADING, DONE],
+        "failing": [LOADING],
+    })
+
+    summary = run_on_devices(
+        scenario=make_scenario(),
+        serials=["passing", "failing", "offline"],
+        device_factory=factory,
+    )
+
+    assert summary.scenario_name == "test"
+    assert [r.serial for r in summary.results] == \
+        ["passing", "failing", "offline"]
+    assert [r.success for r in summary.results] == [True, False, False]
+    assert summary.results[0].error is None
+    assert summary.results[1].error is None
+    assert "offline" in summary.results[2].error
+    assert not summary.success
+    assert [r.serial for r in summary.passed] == ["passing"]
+
+    # the click went to the device through adb shell
+    assert devices["passing"].actions == [("adb", "shell 'input tap 10 20'")]
+
+
+def test_all_devices_passed():
+    factory, _ = make_factory({
+        "a": [LOADING, DONE],
+        "b": [LOADING, DONE],
+    })
+
+    summary = run_on_devices(make_scenario(), ["a", "b"], factory)
+
+    assert summary.success
+    assert len(summary.passed) == 2
+
+
+def test_devices_run_concurrently():
+    serials = ["a", "b", "c", "d"]
+    factory, _ = make_factory(
+        {serial: [LOADING, DONE] for serial in serials}, dump_delay=0.3,
+    )
+
+    summary = run_on_devices(make_scenario(), serials, factory)
+
+    assert summary.success
+    assert summary.duration < 0.3 * len(serials)
+
+
+def test_every_device_logs_through_its_own_logger(caplog):
+    factory, _ = make_factory({
+        "passing": [LOADING, DONE],
+        "failing": [LOADING],
+    })
+
+    with caplog.at_level(logging.DEBUG, logger="roboflow"):
+        run_on_devices(make_scenario(), ["passing", "failing"], factory)
+
+    def messages(serial: str) -> list[str]:
+        return [
+            r.getMessage() for r in caplog.records
+            if r.name == f"roboflow.{serial}"
+        ]
+
+    assert "Success" in messages("passing")
+    assert "Failed" not in messages("passing")
+    assert "Failed" in messages("failing")
+    assert "Success" not in messages("failing")
+    assert "Entering state: done" in messages("passing")
+    assert not any(
+        r.name == "roboflow" and r.getMessage().startswith("Entering state")
+        for r in caplog.records
+    )